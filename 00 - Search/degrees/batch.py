@@ -0,0 +1,182 @@
+"""
+Long-lived batch query mode for degrees.
+
+Reads JSON lines such as {"source": "Kevin Bacon", "target": "Tom Cruise"}
+from a file or stdin, answers them over a worker pool against a single
+in-memory copy of the data, and streams one JSON result line per query.
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import degrees
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for an IMDB id or an unambiguous name.
+    Raises ValueError if the person cannot be identified.
+    """
+    value = str(value)
+    if value in degrees.people:
+        return value
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    if not person_ids:
+        raise ValueError(f"person not found: {value}")
+    raise ValueError(f"ambiguous name: {value} ({', '.join(sorted(person_ids))})")
+
+
+def answer(query, bidirectional=False):
+    """
+    Answers one query dict, returning a JSON-ready result dict that
+    includes the search latency in milliseconds.
+    """
+    result = {key: query[key] for key in ("id", "source", "target") if key in query}
+    start = time.perf_counter()
+    try:
+        source = resolve_person(query["source"])
+        target = resolve_person(query["target"])
+        path = degrees.shortest_path(source, target, bidirectional=bidirectional)
+    except (KeyError, ValueError) as e:
+        result["error"] = str(e) if not isinstance(e, KeyError) else f"missing field {e}"
+    else:
+        result["degrees"] = None if path is None else len(path)
+        result["path"] = path
+    result["latency_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Returns nearest-rank percentiles of a list of numbers.
+    """
+    ordered = sorted(values)
+    summary = {}
+    for point in points:
+        if not ordered:
+            summary[f"p{point}"] = None
+            continue
+        rank = max(1, -(-point * len(ordered) // 100))
+        summary[f"p{point}"] = ordered[rank - 1]
+    return summary
+
+
+def run(lines, output, workers=4, processes=False, bidirectional=False,
+        directory=None, use_snapshot=True, streaming=False, window=1024):
+    """
+    Answers the JSON query lines in `lines`, writing results to `output`
+    in input order as soon as each is ready. Returns a latency summary.
+
+    A writer thread waits on the oldest pending query and writes its result
+    the moment it is answered, whether or not more input has arrived. At
+    most `window` queries are in flight; reading pauses beyond that.
+
+    Thread workers share the already loaded data; process workers load
+    `directory` themselves, which is cheap when a snapshot is used.
+    """
+    if processes:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=degrees.load_data,
+            initargs=(directory, use_snapshot, streaming)
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    latencies = []
+    errors = 0
+
+    def emit(future):
+        nonlocal errors
+        result = future.result()
+        if "latency_ms" in result:
+            latencies.append(result["latency_ms"])
+        if "error" in result:
+            errors += 1
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    # Futures in input order, ended by None; the bound is the window
+    pending = queue.Queue(maxsize=window)
+    failure = []
+
+    def write_results():
+        try:
+            for future in iter(pending.get, None):
+                emit(future)
+        except BaseException as e:
+            failure.append(e)
+            # Keep draining so the reader never blocks on a full queue
+            for future in iter(pending.get, None):
+                pass
+
+    writer = threading.Thread(target=write_results, daemon=True)
+    writer.start()
+    with executor:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                query = json.loads(line)
+            except ValueError:
+                query = None
+            if isinstance(query, dict):
+                future = executor.submit(answer, query, bidirectional)
+            else:
+                # Report malformed lines in order without a worker
+                future = Future()
+                future.set_result({"error": "invalid query", "line": line})
+            pending.put(future)
+            if failure:
+                break
+        pending.put(None)
+        writer.join()
+    if failure:
+        raise failure[0]
+
+    summary = {"queries": len(latencies), "errors": errors}
+    summary.update({f"{k}_ms": v for k, v in percentiles(latencies).items()})
+    summary["max_ms"] = max(latencies) if latencies else None
+
+    # Process workers each keep their own cache, out of reach here
+    if not processes:
+        summary["cache"] = degrees.path_cache.info()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer degrees queries in batch.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?", help="JSON lines file (default: stdin)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true",
+                        help="use a process pool instead of threads")
+    parser.add_argument("--bidirectional", action="store_true")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="parse the CSV files instead of using a snapshot")
+    parser.add_argument("--streaming", action="store_true",
+                        help="stream the CSV files into a compact graph (implies --no-snapshot)")
+    args = parser.parse_args()
+
+    use_snapshot = not (args.no_snapshot or args.streaming)
+    degrees.load_data(args.directory, use_snapshot=use_snapshot, streaming=args.streaming)
+    print("Data loaded.", file=sys.stderr)
+
+    lines = open(args.queries, encoding="utf-8") if args.queries else sys.stdin
+    with lines:
+        summary = run(lines, sys.stdout, workers=args.workers,
+                      processes=args.processes, bidirectional=args.bidirectional,
+                      directory=args.directory, use_snapshot=use_snapshot,
+                      streaming=args.streaming)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark harness for the degrees search strategies.
+
+Generates a synthetic bipartite actor/movie dataset in CSV form, samples
+random source/target pairs, and times each search engine over them.
+Prints one JSON document with throughput, latency percentiles, nodes
+expanded and load-time memory for every engine.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import degrees
+from batch import percentiles
+from util import SearchStats
+
+# Each engine is (load_data keyword arguments, shortest_path keyword arguments)
+ENGINES = {
+    "bfs": ({}, {"use_cache": False}),
+    "bidirectional": ({}, {"bidirectional": True, "use_cache": False}),
+    "compact": ({"streaming": True}, {"use_cache": False}),
+    "compact-bidirectional": ({"streaming": True}, {"bidirectional": True, "use_cache": False}),
+    "snapshot": ({"use_snapshot": True}, {"bidirectional": True, "use_cache": False}),
+    "cached": ({"streaming": True}, {"bidirectional": True}),
+}
+
+
+def generate(directory, people=10000, movies=5000, cast=6,
+             distribution="powerlaw", seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv for a random bipartite
+    graph to `directory`, returning the ids of people cast in any movie.
+
+    Cast sizes average `cast`. With the "uniform" distribution every
+    person is equally likely to be cast; with "powerlaw", popularity
+    follows a Zipf-like law so a few people appear in many movies.
+    """
+    rng = random.Random(seed)
+    person_ids = [str(100000 + i) for i in range(people)]
+    movie_ids = [str(500000 + i) for i in range(movies)]
+
+    # Cumulative weights are summed once here rather than per movie
+    if distribution == "uniform":
+        cum_weights = None
+    elif distribution == "powerlaw":
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(people)))
+    else:
+        raise ValueError(f"unknown distribution: {distribution}")
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i, person_id in enumerate(person_ids):
+            writer.writerow([person_id, f"Person {i}", 1900 + rng.randrange(120)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i, movie_id in enumerate(movie_ids):
+            writer.writerow([movie_id, f"Movie {i}", 1920 + rng.randrange(100)])
+
+    cast_ids = set()
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id in movie_ids:
+            size = max(1, min(people, round(rng.expovariate(1 / cast))))
+            for person_id in set(rng.choices(person_ids, cum_weights=cum_weights, k=size)):
+                writer.writerow([person_id, movie_id])
+                cast_ids.add(person_id)
+
+    # Only people with at least one movie make useful query endpoints
+    return sorted(cast_ids)
+
+
+def sample_pairs(person_ids, count, repeat=0.0, seed=0):
+    """
+    Returns `count` random (source, target) pairs. With probability
+    `repeat` a pair repeats an earlier one, possibly reversed.
+    """
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        if pairs and rng.random() < repeat:
+            source, target = rng.choice(pairs)
+            if rng.random() < 0.5:
+                source, target = target, source
+        else:
+            source, target = rng.sample(person_ids, 2)
+        pairs.append((source, target))
+    return pairs
+
+
+def run_engine(name, directory, pairs):
+    """
+    Loads the data as engine `name` expects and answers every pair,
+    returning a dict of measurements.
+    """
+    load_options, search_options = ENGINES[name]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    degrees.load_data(directory, **load_options)
+    load_seconds = time.perf_counter() - start
+    _, load_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    expanded = []
+    peak_frontier = 0
+    connected = 0
+    start = time.perf_counter()
+    for source, target in pairs:
+        stats = SearchStats()
+        query_start = time.perf_counter()
+        path = degrees.shortest_path(source, target, stats=stats, **search_options)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+        expanded.append(stats.nodes_expanded)
+        peak_frontier = max(peak_frontier, stats.peak_frontier)
+        connected += path is not None
+    total = time.perf_counter() - start
+
+    result = {
+        "engine": name,
+        "queries": len(pairs),
+        "connected": connected,
+        "throughput_qps": len(pairs) / total if total else None,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+    }
+    result.update({f"{k}_ms": v for k, v in percentiles(latencies, (50, 99)).items()})
+    result["mean_nodes_expanded"] = sum(expanded) / len(expanded) if expanded else None
+    result["peak_frontier"] = peak_frontier
+    result["load_seconds"] = load_seconds
+    result["load_peak_bytes"] = load_peak
+    if name == "cached":
+        result["cache"] = degrees.path_cache.info()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees search engines.")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--cast", type=float, default=6, help="mean cast size")
+    parser.add_argument("--distribution", choices=("uniform", "powerlaw"), default="powerlaw")
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--repeat", type=float, default=0.0,
+                        help="probability that a sampled pair repeats an earlier one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help=f"comma-separated subset of: {', '.join(ENGINES)}")
+    args = parser.parse_args()
+
+    engines = args.engines.split(",")
+    for name in engines:
+        if name not in ENGINES:
+            sys.exit(f"Unknown engine: {name}")
+
+    config = vars(args)
+    with tempfile.TemporaryDirectory() as directory:
+        person_ids = generate(directory, args.people, args.movies, args.cast,
+                              args.distribution, args.seed)
+        pairs = sample_pairs(person_ids, args.pairs, args.repeat, args.seed)
+        results = [run_engine(name, directory, pairs) for name in engines]
+
+    json.dump({"config": config, "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Bounded LRU cache of shortest path results for degrees.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Returned by PathCache.get when a pair has not been cached
+MISSING = object()
+
+
+def reverse_path(source, path):
+    """
+    Turns a (movie_id, person_id) path from `source` into the
+    equivalent path from its last person back to `source`.
+    """
+    people = [source] + [person for _, person in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
+
+
+class PathCache():
+    """
+    LRU cache keyed on the unordered pair of people, so a query and its
+    reverse share one entry. Disconnected pairs are cached as None.
+    All methods are safe to call from concurrent threads.
+
+    `generation` counts calls to clear(). Read it before searching and
+    pass it to put(), so a result computed before the graph changed is
+    dropped rather than cached.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target, None if they are
+        cached as not connected, or MISSING.
+        """
+        key = (source, target) if source <= target else (target, source)
+        with self.lock:
+            path = self.entries.get(key, MISSING)
+            if path is MISSING:
+                self.misses += 1
+                return MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        # Entries are stored in key order, from key[0] to key[1]
+        if path is None:
+            return None
+        if source == key[0]:
+            return list(path)
+        return reverse_path(target, path)
+
+    def put(self, source, target, path, generation=None):
+        """
+        Caches a path, unless `generation` is given and the cache has been
+        cleared since it was read.
+        """
+        if self.maxsize <= 0:
+            return
+        if source <= target:
+            key = (source, target)
+        else:
+            key = (target, source)
+            if path is not None:
+                path = reverse_path(source, path)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = path
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops every entry, e.g. because the graph has changed.
+        The hit and miss counters are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+    def info(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self.entries), "maxsize": self.maxsize}
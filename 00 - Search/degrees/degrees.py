@@ -1,7 +1,11 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import hubs
+import snapshot
+import stream
+from cache import MISSING, PathCache
+from util import Node, DequeQueueFrontier, SearchStats, bidirectional_search
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +16,57 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact graph searched by default when the data came from a snapshot
+compact_graph = None
 
-def load_data(directory):
+# The snapshot or streamed data behind the views, and its directory
+graph_data = None
+data_directory = None
+
+# Precomputed degree tables for hub people in the snapshot, if any
+hub_tables = None
+
+# Memoised query results, cleared whenever the data changes
+path_cache = PathCache()
+
+
+def load_data(directory, use_snapshot=False, streaming=False):
     """
     Load data from CSV files into memory.
+
+    With `use_snapshot`, the data is instead memory-mapped from a binary
+    snapshot next to the CSV files, which is written on first use and
+    rebuilt whenever the CSV files change. `names`, `people` and `movies`
+    then become read-only views over the snapshot, and any hub tables
+    saved by hubs.py for the directory are loaded alongside it.
+
+    With `streaming`, the CSV files are parsed in chunks into a compact
+    graph, and the same views read names and titles back lazily.
     """
+    global names, people, movies, compact_graph, hub_tables
+    global graph_data, data_directory
+
+    hub_tables = None
+    path_cache.clear()
+    data_directory = directory
+    if use_snapshot or streaming:
+        if use_snapshot:
+            graph_data = snapshot.load(directory)
+            hub_tables = hubs.load(directory, graph_data.graph)
+        else:
+            graph_data = stream.load(directory)
+        names = graph_data.names
+        people = graph_data.people
+        movies = graph_data.movies
+        compact_graph = graph_data.graph
+        return
+
+    # Replace any views with plain dicts
+    if compact_graph is not None:
+        names, people, movies = {}, {}, {}
+        compact_graph = None
+        graph_data = None
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -52,6 +102,54 @@ def load_data(directory):
                 pass
 
 
+def add_data(people_rows=(), movie_rows=(), star_rows=()):
+    """
+    Adds rows shaped like those of people.csv, movies.csv and stars.csv
+    to the loaded data in place, without rereading the CSV files.
+    Existing people and movies are left as they are.
+
+    When the data came from a snapshot, the rows are also journalled next
+    to it so that later snapshot loads include them.
+    """
+    global hub_tables
+
+    people_rows, movie_rows, star_rows = list(people_rows), list(movie_rows), list(star_rows)
+
+    if graph_data is not None:
+        graph_data.apply(people_rows, movie_rows, star_rows)
+        if isinstance(graph_data, snapshot.Snapshot):
+            snapshot.append_journal(graph_data, data_directory,
+                                    people_rows, movie_rows, star_rows)
+    else:
+        for row in people_rows:
+            if row["id"] in people:
+                continue
+            people[row["id"]] = {
+                "name": row["name"],
+                "birth": row["birth"],
+                "movies": set()
+            }
+            names.setdefault(row["name"].lower(), set()).add(row["id"])
+        for row in movie_rows:
+            if row["id"] in movies:
+                continue
+            movies[row["id"]] = {
+                "title": row["title"],
+                "year": row["year"],
+                "stars": set()
+            }
+        for row in star_rows:
+            try:
+                people[row["person_id"]]["movies"].add(row["movie_id"])
+                movies[row["movie_id"]]["stars"].add(row["person_id"])
+            except KeyError:
+                pass
+
+    # New stars can shorten paths, so tables and cached results are stale
+    hub_tables = None
+    path_cache.clear()
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -59,7 +157,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, use_snapshot=True)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -84,19 +182,64 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, stats=None, graph=None,
+                  use_cache=True):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    With `bidirectional` set, frontiers are grown from both ends and meet
+    in the middle. Pass a SearchStats as `stats` to collect counters, and
+    a graph.CompactGraph as `graph` to search it instead of the dicts;
+    a graph loaded from a snapshot is searched by default. Pairs with a
+    hub at either end are answered from the hub tables without searching.
+
+    Results for the loaded data are memoised in `path_cache` unless
+    `use_cache` is False or an explicit `graph` is given.
     """
+    if graph is not None:
+        return graph.shortest_path(source, target, bidirectional, stats)
+    if not use_cache:
+        return _search(source, target, bidirectional, stats)
+
+    # Results of a search overtaken by add_data or load_data are dropped
+    generation = path_cache.generation
+    path = path_cache.get(source, target)
+    if path is MISSING:
+        path = _search(source, target, bidirectional, stats)
+        path_cache.put(source, target, path, generation)
+    return path
+
+
+def _search(source, target, bidirectional, stats):
+    """
+    Answers a query against the loaded data without the path cache.
+    """
+    if hub_tables is not None and hub_tables.covers(source, target):
+        return hub_tables.shortest_path(source, target)
+    if compact_graph is not None:
+        return compact_graph.shortest_path(source, target, bidirectional, stats)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target, stats)
+    return breadth_first_shortest_path(source, target, stats)
+
+
+def breadth_first_shortest_path(source, target, stats=None):
+    """
+    Single-frontier breadth-first search over the loaded dicts.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if source == target:
+        return []
 
     # degrees_of_separation = 0
 
     # Initiate queue using source actor, high depth means that BFS more efficient
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     frontier.add(start)
 
     # Document seen actors to prevent repeat loops
@@ -105,12 +248,13 @@ def shortest_path(source, target):
     while True:
 
         if frontier.empty():
-            raise Exception('No connection.')
+            return None
 
         # Select next node in the queue, identify related actors as consequent nodes
         current_node = frontier.remove()
         neighbours = neighbors_for_person(current_node.state)
         seen.add(current_node.state)
+        stats.nodes_expanded += 1
 
         for movie, actor in neighbours:
             # Node not seen, actor queued for search
@@ -129,6 +273,18 @@ def shortest_path(source, target):
                     return path
                 # Target not found, continue through queue
                 frontier.add(curr)
+                stats.observe_frontier(len(frontier))
+
+
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Breadth-first search grown from both the source and the target.
+
+    Returns the same (movie_id, person_id) path as shortest_path,
+    or None if the two people are not connected.
+    """
+    return bidirectional_search(source, target, neighbors_for_person, stats)
+
 
 def person_id_for_name(name):
     """
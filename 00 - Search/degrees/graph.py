@@ -0,0 +1,278 @@
+"""
+Compact, integer-indexed storage for the degrees dataset.
+"""
+
+import csv
+from array import array
+from collections import deque
+
+from util import SearchStats, bidirectional_search
+
+
+class CompactGraph():
+    """
+    Bipartite person/movie graph in compressed sparse row (CSR) form.
+
+    People and movies are numbered densely from 0. The movies of person p
+    are `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie m are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    All four buffers are flat sequences of machine ints, either arrays or
+    memoryviews over a snapshot file.
+
+    The buffers are never modified. People, movies and stars added later
+    with add_person, add_movie and add_star are kept in small overlay
+    dicts that neighbor iteration merges in.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Map string IMDB ids back to their dense indices
+        if person_index is None:
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+
+        # Rows beyond the CSR buffers, and stars added since they were built
+        self.base_people = len(person_offsets) - 1
+        self.base_movies = len(movie_offsets) - 1
+        self.added_movies = {}
+        self.added_stars = {}
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edges):
+        """
+        Builds a graph from (person index, movie index) star pairs.
+        """
+        edge_people = array("i", (p for p, _ in edges))
+        edge_movies = array("i", (m for _, m in edges))
+        return cls.from_edge_arrays(person_ids, movie_ids, edge_people, edge_movies)
+
+    @classmethod
+    def from_edge_arrays(cls, person_ids, movie_ids, edge_people, edge_movies,
+                         person_index=None, movie_index=None):
+        """
+        Builds a graph from parallel arrays of star person and movie
+        indices, dropping any repeated pairs.
+        """
+        person_offsets, person_movies = _dedupe_rows(
+            *_scatter(len(person_ids), edge_people, edge_movies)
+        )
+
+        # Rebuild the person column from the deduplicated rows
+        edge_people = array("i")
+        for p in range(len(person_ids)):
+            edge_people.extend(array("i", [p]) * (person_offsets[p + 1] - person_offsets[p]))
+        movie_offsets, movie_people = _scatter(len(movie_ids), person_movies, edge_people)
+
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_people,
+                   person_index, movie_index)
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a graph from the `people` and `movies` dicts of degrees.py.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        edges = [
+            (p, movie_index[movie_id])
+            for p, person_id in enumerate(person_ids)
+            for movie_id in people[person_id]["movies"]
+        ]
+        return cls.from_edges(person_ids, movie_ids, edges)
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph straight from the CSV files, keeping only ids.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            person_ids = [row["id"] for row in csv.DictReader(f)]
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            movie_ids = [row["id"] for row in csv.DictReader(f)]
+
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    edges.add((person_index[row["person_id"]],
+                               movie_index[row["movie_id"]]))
+                except KeyError:
+                    pass
+        return cls.from_edges(person_ids, movie_ids, sorted(edges))
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def add_person(self, person_id):
+        """
+        Returns the index of a person, appending them if they are new.
+        """
+        if person_id not in self.person_index:
+            self.person_ids.append(person_id)
+            self.person_index[person_id] = len(self.person_ids) - 1
+        return self.person_index[person_id]
+
+    def add_movie(self, movie_id):
+        """
+        Returns the index of a movie, appending it if it is new.
+        """
+        if movie_id not in self.movie_index:
+            self.movie_ids.append(movie_id)
+            self.movie_index[movie_id] = len(self.movie_ids) - 1
+        return self.movie_index[movie_id]
+
+    def add_star(self, person, movie):
+        """
+        Records that the person at index `person` starred in the movie at
+        index `movie`. Returns False if that was already known.
+        """
+        if movie in self.movies_of(person):
+            return False
+        self.added_movies.setdefault(person, []).append(movie)
+        self.added_stars.setdefault(movie, []).append(person)
+        return True
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices of a person as a list.
+        """
+        movies = []
+        if person < self.base_people:
+            movies.extend(self.person_movies[
+                self.person_offsets[person]:self.person_offsets[person + 1]
+            ])
+        movies.extend(self.added_movies.get(person, ()))
+        return movies
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices of a movie's stars as a list.
+        """
+        stars = []
+        if movie < self.base_movies:
+            stars.extend(self.movie_people[
+                self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+            ])
+        stars.extend(self.added_stars.get(movie, ()))
+        return stars
+
+    def neighbors(self, person):
+        """
+        Yields (movie index, person index) pairs for people who
+        starred with the person at index `person`.
+        """
+        if self.added_movies or person >= self.base_people:
+            for movie in self.movies_of(person):
+                for actor in self.stars_of(movie):
+                    yield movie, actor
+            return
+
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for s in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[s]
+
+    def shortest_path(self, source, target, bidirectional=False, stats=None):
+        """
+        Same contract as degrees.shortest_path, taking and returning
+        string IMDB ids but searching over the dense indices.
+        """
+        if stats is None:
+            stats = SearchStats()
+        source = self.person_index[source]
+        target = self.person_index[target]
+
+        if bidirectional:
+            path = bidirectional_search(source, target, self.neighbors, stats)
+        else:
+            path = self._breadth_first(source, target, stats)
+
+        if path is None:
+            return None
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def _breadth_first(self, source, target, stats):
+        """
+        Single-frontier BFS using flat parent arrays instead of Nodes.
+        """
+        if source == target:
+            return []
+
+        # -1 marks a person not yet reached
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        parent_person[source] = source
+        frontier = deque([source])
+
+        while frontier:
+            person = frontier.popleft()
+            stats.nodes_expanded += 1
+            for movie, actor in self.neighbors(person):
+                if parent_person[actor] != -1:
+                    continue
+                parent_person[actor] = person
+                parent_movie[actor] = movie
+                if actor == target:
+                    path = []
+                    while actor != source:
+                        path.append((parent_movie[actor], actor))
+                        actor = parent_person[actor]
+                    path.reverse()
+                    return path
+                frontier.append(actor)
+            stats.observe_frontier(len(frontier))
+
+        return None
+
+
+def _scatter(size, keys, values):
+    """
+    Groups `values` by their parallel `keys` into CSR offsets and rows,
+    keeping input order within each row.
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    # Scatter each value into its row, advancing a per-row cursor
+    rows = array("i", [0]) * len(values)
+    cursor = array("i", offsets[:-1])
+    for key, value in zip(keys, values):
+        rows[cursor[key]] = value
+        cursor[key] += 1
+    return offsets, rows
+
+
+def _dedupe_rows(offsets, rows):
+    """
+    Drops repeated values within each CSR row.
+    """
+    new_offsets = array("i", [0])
+    new_rows = array("i")
+    for i in range(len(offsets) - 1):
+        row = rows[offsets[i]:offsets[i + 1]]
+        if len(set(row)) < len(row):
+            row = array("i", dict.fromkeys(row))
+        new_rows.extend(row)
+        new_offsets.append(len(new_rows))
+    return new_offsets, new_rows
@@ -0,0 +1,224 @@
+"""
+Precomputed single-source degree tables for hub actors.
+
+A table holds the distance and BFS parent of every person relative to one
+source, so any path that starts or ends at that source is a table walk
+instead of a search. Tables for a list of hubs are persisted next to the
+CSV files in snapshot format, keyed to the CSV files and to the snapshot
+and journal whose person numbering they use.
+"""
+
+import os
+import sys
+from array import array
+from collections import deque
+
+import snapshot
+from snapshot import StringTable
+
+HUBS_NAME = "hubs.bin"
+
+
+class DegreeTable():
+    """
+    Distances and BFS parents from one source person to every person in
+    a CompactGraph, by dense index. -1 marks a person that is unreachable.
+    """
+
+    def __init__(self, source, distance, parent_person, parent_movie):
+        self.source = source
+        self.distance = distance
+        self.parent_person = parent_person
+        self.parent_movie = parent_movie
+
+    def within(self, degrees):
+        """
+        Returns the indices of every person at most `degrees` away.
+        """
+        return [p for p, d in enumerate(self.distance) if 0 <= d <= degrees]
+
+    def path_from_source(self, target):
+        """
+        Returns the (movie, person) index path from the source to `target`,
+        or None if it is unreachable.
+        """
+        if self.distance[target] == -1:
+            return None
+        path = []
+        person = target
+        while person != self.source:
+            path.append((self.parent_movie[person], person))
+            person = self.parent_person[person]
+        path.reverse()
+        return path
+
+    def path_to_source(self, target):
+        """
+        Returns the (movie, person) index path from `target` to the source,
+        or None if it is unreachable.
+        """
+        if self.distance[target] == -1:
+            return None
+        path = []
+        person = target
+        while person != self.source:
+            parent = self.parent_person[person]
+            path.append((self.parent_movie[person], parent))
+            person = parent
+        return path
+
+
+def single_source(graph, source, stats=None):
+    """
+    Runs one full BFS over a CompactGraph from the person at index
+    `source`, returning a DegreeTable covering every person.
+    """
+    size = len(graph)
+    distance = array("i", [-1]) * size
+    parent_person = array("i", [-1]) * size
+    parent_movie = array("i", [-1]) * size
+    distance[source] = 0
+    parent_person[source] = source
+    frontier = deque([source])
+
+    while frontier:
+        person = frontier.popleft()
+        if stats is not None:
+            stats.nodes_expanded += 1
+        for movie, actor in graph.neighbors(person):
+            if distance[actor] != -1:
+                continue
+            distance[actor] = distance[person] + 1
+            parent_person[actor] = person
+            parent_movie[actor] = movie
+            frontier.append(actor)
+        if stats is not None:
+            stats.observe_frontier(len(frontier))
+
+    return DegreeTable(source, distance, parent_person, parent_movie)
+
+
+class HubTables():
+    """
+    Degree tables for a set of hub people, answering any shortest path
+    query that has a hub at either end.
+    """
+
+    def __init__(self, graph, tables):
+        self.graph = graph
+        self.tables = tables
+
+    def __contains__(self, person_id):
+        return self.graph.person_index.get(person_id) in self.tables
+
+    def covers(self, source, target):
+        return source in self or target in self
+
+    def shortest_path(self, source, target):
+        """
+        Same contract as degrees.shortest_path for a covered pair.
+        """
+        graph = self.graph
+        s = graph.person_index[source]
+        t = graph.person_index[target]
+        if s in self.tables:
+            path = self.tables[s].path_from_source(t)
+        else:
+            path = self.tables[t].path_to_source(s)
+        if path is None:
+            return None
+        return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+def build(graph, hub_ids):
+    """
+    Computes degree tables for the given hub person_ids.
+    """
+    tables = {}
+    for person_id in hub_ids:
+        source = graph.person_index[person_id]
+        tables[source] = single_source(graph, source)
+    return HubTables(graph, tables)
+
+
+def hubs_path(directory):
+    return os.path.join(directory, HUBS_NAME)
+
+
+def hubs_signature(directory):
+    return snapshot.source_signature(
+        directory, snapshot.SOURCES + (snapshot.SNAPSHOT_NAME, snapshot.JOURNAL_NAME)
+    )
+
+
+def save(hub_tables, directory):
+    """
+    Persists hub tables next to the CSV files of `directory`.
+    """
+    sources = sorted(hub_tables.tables)
+    offsets, data = snapshot.encode_strings(
+        [hub_tables.graph.person_ids[source] for source in sources]
+    )
+    sections = {"hub_ids.offsets": offsets, "hub_ids.data": data}
+    for k, source in enumerate(sources):
+        table = hub_tables.tables[source]
+        sections[f"distance.{k}"] = table.distance
+        sections[f"parent_person.{k}"] = table.parent_person
+        sections[f"parent_movie.{k}"] = table.parent_movie
+    snapshot.write(hubs_path(directory), sections, hubs_signature(directory))
+
+
+def load(directory, graph):
+    """
+    Memory-maps the persisted hub tables of `directory` for use with
+    `graph`, the graph of that directory's snapshot. Returns None if
+    there are none or they are out of date.
+    """
+    try:
+        loaded = snapshot.read_sections(hubs_path(directory), hubs_signature(directory),
+                                        ("hub_ids.offsets", "hub_ids.data"))
+    except (OSError, ValueError):
+        return None
+    if loaded is None:
+        return None
+    _, sections, _ = loaded
+
+    # Unreadable tables are ignored like stale ones
+    hub_ids = StringTable(sections["hub_ids.offsets"], sections["hub_ids.data"])
+    tables = {}
+    for k in range(len(hub_ids)):
+        columns = [sections.get(f"{name}.{k}")
+                   for name in ("distance", "parent_person", "parent_movie")]
+        if any(column is None or len(column) != len(graph) for column in columns):
+            return None
+        try:
+            source = graph.person_index[hub_ids[k]]
+        except (KeyError, UnicodeDecodeError):
+            return None
+        tables[source] = DegreeTable(source, *columns)
+    return HubTables(graph, tables)
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python hubs.py directory person [person ...]")
+    directory = sys.argv[1]
+
+    import degrees
+    from batch import resolve_person
+
+    degrees.load_data(directory, use_snapshot=True)
+    hub_ids = []
+    for value in sys.argv[2:]:
+        try:
+            hub_ids.append(resolve_person(value))
+        except ValueError as e:
+            sys.exit(str(e))
+
+    print(f"Computing tables for {len(hub_ids)} hubs...")
+    save(build(degrees.compact_graph, hub_ids), directory)
+    print(f"Saved to {hubs_path(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+"""
+Binary snapshot cache for the degrees dataset.
+
+The first load of a directory parses its CSV files and writes a single
+snapshot file next to them. Later loads memory-map that file, so the
+graph buffers and string tables are used in place without parsing.
+
+Rows added to a loaded snapshot with Snapshot.apply can be persisted in
+a journal next to it, which later loads replay on top of the mapped file
+and the next rebuild folds back in.
+"""
+
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from graph import CompactGraph
+
+SNAPSHOT_NAME = "snapshot.bin"
+JOURNAL_NAME = "snapshot.journal"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+MAGIC = b"DEGREES1"
+VERSION = 1
+
+# Sections are aligned so int buffers can be cast in place
+ALIGNMENT = 8
+
+# Typecodes a section may be cast to, see write()
+TYPECODES = "bBhHiIlLqQ"
+
+# Sections every snapshot has, see build()
+SNAPSHOT_SECTIONS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_people", "name_people",
+) + tuple(
+    f"{name}.{part}"
+    for name in ("person_ids", "person_names", "person_births", "movie_ids",
+                 "movie_titles", "movie_years", "name_keys")
+    for part in ("offsets", "data")
+)
+
+
+class StringTable():
+    """
+    Sequence of strings stored as one UTF-8 blob plus offsets. Strings
+    appended after loading are kept in a plain list after the blob.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+        self.base = len(offsets) - 1
+        self.extra = []
+
+    def __len__(self):
+        return self.base + len(self.extra)
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        if i >= self.base:
+            return self.extra[i - self.base]
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def append(self, s):
+        self.extra.append(s)
+
+
+class SortedIndex(Mapping):
+    """
+    Maps strings in a sorted StringTable back to their positions. The
+    table's appended strings are unsorted, so they are indexed in a dict.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.added = {}
+
+    def __getitem__(self, key):
+        if key in self.added:
+            return self.added[key]
+        i = bisect_left(self.table, key, 0, self.table.base)
+        if i < self.table.base and self.table[i] == key:
+            return i
+        raise KeyError(key)
+
+    def __setitem__(self, key, i):
+        self.added[key] = i
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+
+class PeopleView(Mapping):
+    """
+    Lazily decoded stand-in for the `people` dict of degrees.py.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, person_id):
+        s = self.snapshot
+        p = s.graph.person_index[person_id]
+        return {
+            "name": s.person_names[p],
+            "birth": s.person_births[p],
+            "movies": {s.graph.movie_ids[m] for m in s.graph.movies_of(p)}
+        }
+
+    def __iter__(self):
+        return iter(self.snapshot.graph.person_ids)
+
+    def __len__(self):
+        return len(self.snapshot.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Lazily decoded stand-in for the `movies` dict of degrees.py.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, movie_id):
+        s = self.snapshot
+        m = s.graph.movie_index[movie_id]
+        return {
+            "title": s.movie_titles[m],
+            "year": s.movie_years[m],
+            "stars": {s.graph.person_ids[p] for p in s.graph.stars_of(m)}
+        }
+
+    def __iter__(self):
+        return iter(self.snapshot.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.snapshot.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Lazily decoded stand-in for the `names` dict of degrees.py.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.added = {}
+
+    def __getitem__(self, name):
+        s = self.snapshot
+        i = bisect_left(s.name_keys, name)
+        person_ids = set(self.added.get(name, ()))
+        while i < len(s.name_keys) and s.name_keys[i] == name:
+            person_ids.add(s.graph.person_ids[s.name_people[i]])
+            i += 1
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        name_keys = self.snapshot.name_keys
+        for key in name_keys:
+            if key != previous:
+                yield key
+                previous = key
+        # Added names are new unless the snapshot already has them
+        for key in self.added:
+            i = bisect_left(name_keys, key)
+            if i == len(name_keys) or name_keys[i] != key:
+                yield key
+
+    def add(self, name, person_id):
+        self.added.setdefault(name, set()).add(person_id)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class GraphData():
+    """
+    A CompactGraph plus side tables of names, births, titles and years
+    by dense index, with dict-like `people`, `movies` and `names` views.
+    Subclasses set `graph`, the four side tables and the views.
+    """
+
+    def apply(self, people=(), movies=(), stars=()):
+        """
+        Adds CSV-style rows to the data in memory. People and movies
+        that already exist, and stars naming unknown people or movies,
+        are skipped as in degrees.load_data.
+        """
+        graph = self.graph
+        for row in people:
+            if row["id"] in graph.person_index:
+                continue
+            graph.add_person(row["id"])
+            self.person_names.append(row["name"])
+            self.person_births.append(row["birth"])
+            self.names.add(row["name"].lower(), row["id"])
+        for row in movies:
+            if row["id"] in graph.movie_index:
+                continue
+            graph.add_movie(row["id"])
+            self.movie_titles.append(row["title"])
+            self.movie_years.append(row["year"])
+        for row in stars:
+            try:
+                person = graph.person_index[row["person_id"]]
+                movie = graph.movie_index[row["movie_id"]]
+            except KeyError:
+                continue
+            graph.add_star(person, movie)
+
+
+class Snapshot(GraphData):
+    """
+    A loaded snapshot: the compact graph plus its side tables, all
+    backed by the mapped file.
+    """
+
+    def __init__(self, sections, buffer=None, sources=None):
+        self.buffer = buffer
+        self.sources = sources
+
+        def table(name):
+            return StringTable(sections[f"{name}.offsets"], sections[f"{name}.data"])
+
+        person_ids = table("person_ids")
+        movie_ids = table("movie_ids")
+        self.graph = CompactGraph(
+            person_ids, movie_ids,
+            sections["person_offsets"], sections["person_movies"],
+            sections["movie_offsets"], sections["movie_people"],
+            person_index=SortedIndex(person_ids),
+            movie_index=SortedIndex(movie_ids)
+        )
+        self.person_names = table("person_names")
+        self.person_births = table("person_births")
+        self.movie_titles = table("movie_titles")
+        self.movie_years = table("movie_years")
+        self.name_keys = table("name_keys")
+        self.name_people = sections["name_people"]
+
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+        self.names = NamesView(self)
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def source_signature(directory, names=SOURCES):
+    """
+    Returns the size and modification time of each CSV file, or of each
+    of `names`, with None for files that do not exist.
+    """
+    signature = {}
+    for name in names:
+        try:
+            info = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            signature[name] = None
+        else:
+            signature[name] = [info.st_size, info.st_mtime_ns]
+    return signature
+
+
+def journal_path(directory):
+    return os.path.join(directory, JOURNAL_NAME)
+
+
+def load(directory):
+    """
+    Loads the snapshot for a directory, rebuilding it first if it is
+    missing, unreadable or older than the CSV files, and replays any
+    rows journalled against it since.
+    """
+    signature = source_signature(directory)
+    try:
+        snapshot = read(snapshot_path(directory), signature)
+    except (OSError, ValueError):
+        snapshot = None
+    if snapshot is None:
+        build(directory)
+        snapshot = read(snapshot_path(directory), signature)
+        if snapshot is None:
+            raise Exception("snapshot out of date after rebuild")
+
+    for entry in read_journal(directory):
+        if entry["base"] == snapshot.sources:
+            snapshot.apply(entry["people"], entry["movies"], entry["stars"])
+    return snapshot
+
+
+def append_journal(snapshot, directory, people=(), movies=(), stars=()):
+    """
+    Persists rows already applied to a loaded snapshot, so that later
+    loads of the directory include them without a rebuild.
+    """
+    entry = {
+        "base": snapshot.sources,
+        "people": list(people),
+        "movies": list(movies),
+        "stars": list(stars)
+    }
+    with open(journal_path(directory), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def read_journal(directory):
+    """
+    Returns the journal entries of a directory, oldest first.
+    """
+    try:
+        with open(journal_path(directory), encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def read(path, signature=None):
+    """
+    Memory-maps a snapshot file. Returns None if it was written from
+    CSV files that do not match `signature`.
+    """
+    loaded = read_sections(path, signature, SNAPSHOT_SECTIONS)
+    if loaded is None:
+        return None
+    header, sections, buffer = loaded
+    return Snapshot(sections, buffer, header["sources"])
+
+
+def read_sections(path, signature=None, required=()):
+    """
+    Memory-maps any file in snapshot format, returning its header, its
+    named sections and the underlying buffer, or None if it is stale.
+    Raises ValueError if the file is truncated or malformed, or lacks
+    any of the `required` sections.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(buffer)
+    start = len(MAGIC) + 4
+    if len(view) < start or bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a degrees snapshot")
+    (header_length,) = struct.unpack_from("<I", view, len(MAGIC))
+    if start + header_length > len(view):
+        raise ValueError("truncated snapshot header")
+    header = json.loads(str(view[start:start + header_length], "utf-8"))
+    if (not isinstance(header, dict)
+            or not {"version", "byteorder", "sources", "sections"} <= header.keys()
+            or not isinstance(header["sections"], dict)):
+        raise ValueError("malformed snapshot header")
+
+    if header["version"] != VERSION or header["byteorder"] != sys.byteorder:
+        return None
+    if signature is not None and header["sources"] != signature:
+        return None
+
+    for name in required:
+        if name not in header["sections"]:
+            raise ValueError(f"snapshot section missing: {name}")
+    sections = {}
+    for name, entry in header["sections"].items():
+        sections[name] = section_view(view, name, entry)
+    return header, sections, buffer
+
+
+def section_view(view, name, entry):
+    """
+    Returns the section of a mapped file described by a header entry of
+    [offset, length, typecode], raising ValueError if it does not fit.
+    """
+    if not (isinstance(entry, list) and len(entry) == 3):
+        raise ValueError(f"malformed snapshot section: {name}")
+    offset, length, typecode = entry
+    if not (isinstance(offset, int) and isinstance(length, int)
+            and isinstance(typecode, str) and len(typecode) == 1 and typecode in TYPECODES):
+        raise ValueError(f"malformed snapshot section: {name}")
+    if offset < 0 or length < 0 or offset + length > len(view):
+        raise ValueError(f"snapshot section out of bounds: {name}")
+    if length % struct.calcsize(typecode):
+        raise ValueError(f"snapshot section not a whole number of items: {name}")
+
+    section = view[offset:offset + length]
+    return section.cast(typecode) if typecode != "B" else section
+
+
+def build(directory):
+    """
+    Parses the CSV files of a directory and writes its snapshot, folding
+    in and then removing any journalled rows.
+    """
+    signature = source_signature(directory)
+    journal = read_journal(directory)
+
+    def rows(name, fields, key):
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            found = {row["id"]: tuple(row[field] for field in fields)
+                     for row in csv.DictReader(f)}
+        for entry in journal:
+            for row in entry[key]:
+                found.setdefault(row["id"], tuple(row[field] for field in fields))
+        return sorted(found.values())
+
+    people = rows("people.csv", ("id", "name", "birth"), "people")
+    movies = rows("movies.csv", ("id", "title", "year"), "movies")
+
+    # Ids are stored sorted so lookups can bisect the string tables
+    person_index = {row[0]: i for i, row in enumerate(people)}
+    movie_index = {row[0]: i for i, row in enumerate(movies)}
+    edges = set()
+    with open(os.path.join(directory, "stars.csv"), encoding="utf-8") as f:
+        star_rows = list(csv.DictReader(f))
+    for entry in journal:
+        star_rows.extend(entry["stars"])
+    for row in star_rows:
+        try:
+            edges.add((person_index[row["person_id"]],
+                       movie_index[row["movie_id"]]))
+        except KeyError:
+            pass
+    graph = CompactGraph.from_edges(
+        [row[0] for row in people], [row[0] for row in movies], sorted(edges)
+    )
+
+    name_order = sorted(range(len(people)), key=lambda i: people[i][1].lower())
+
+    sections = {
+        "person_offsets": graph.person_offsets,
+        "person_movies": graph.person_movies,
+        "movie_offsets": graph.movie_offsets,
+        "movie_people": graph.movie_people,
+        "name_people": array("i", name_order),
+    }
+    for name, strings in (
+        ("person_ids", [row[0] for row in people]),
+        ("person_names", [row[1] for row in people]),
+        ("person_births", [row[2] for row in people]),
+        ("movie_ids", [row[0] for row in movies]),
+        ("movie_titles", [row[1] for row in movies]),
+        ("movie_years", [row[2] for row in movies]),
+        ("name_keys", [people[i][1].lower() for i in name_order]),
+    ):
+        offsets, data = encode_strings(strings)
+        sections[f"{name}.offsets"] = offsets
+        sections[f"{name}.data"] = data
+
+    write(snapshot_path(directory), sections, signature)
+    if journal:
+        os.remove(journal_path(directory))
+
+
+def write(path, sections, signature):
+    """
+    Writes named int arrays and byte blobs as a snapshot file, replacing
+    any existing file atomically.
+    """
+    layout = {}
+    payload = []
+    offset = 0
+    for name, section in sections.items():
+        if isinstance(section, array):
+            typecode, data = section.typecode, section.tobytes()
+        elif isinstance(section, memoryview):
+            typecode, data = section.format, section.tobytes()
+        else:
+            typecode, data = "B", bytes(section)
+        layout[name] = [offset, len(data), typecode]
+        payload.append(data + bytes(-len(data) % ALIGNMENT))
+        offset += len(payload[-1])
+
+    # Section offsets are absolute, so fix the header size first
+    def header_bytes(base):
+        header = {
+            "version": VERSION,
+            "byteorder": sys.byteorder,
+            "sources": signature,
+            "sections": {name: [base + o, n, t] for name, (o, n, t) in layout.items()}
+        }
+        return json.dumps(header, sort_keys=True).encode("utf-8")
+
+    base = 0
+    while True:
+        header = header_bytes(base)
+        prefix = len(MAGIC) + 4 + len(header)
+        aligned = prefix + (-prefix % ALIGNMENT)
+        if aligned == base:
+            break
+        base = aligned
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(bytes(base - prefix))
+        for data in payload:
+            f.write(data)
+    os.replace(temporary, path)
+
+
+def encode_strings(strings):
+    offsets = array("i", [0])
+    data = bytearray()
+    for s in strings:
+        data += s.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, data
+
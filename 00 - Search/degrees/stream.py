@@ -0,0 +1,176 @@
+"""
+Streaming, bounded-memory loader for the degrees dataset.
+
+The CSV files are parsed in fixed-size chunks of rows. Only the ids and
+star pairs that searching needs are kept while loading, packed into the
+arrays of a CompactGraph. Names, births, titles and years go in a side
+table that is read from the CSV files the first time it is used.
+"""
+
+import csv
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+from itertools import islice
+
+from graph import CompactGraph
+from snapshot import GraphData, MoviesView, PeopleView
+
+CHUNK_SIZE = 65536
+
+
+def chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields the rows of a CSV file, after its header, as lists of at
+    most `chunk_size` rows each.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield [row for row in chunk if row]
+
+
+def load(directory, chunk_size=CHUNK_SIZE):
+    """
+    Streams the CSV files of a directory into a StreamedData.
+    """
+    person_ids = []
+    person_index = {}
+    for chunk in chunks(os.path.join(directory, "people.csv"), chunk_size):
+        for row in chunk:
+            if row[0] not in person_index:
+                person_index[row[0]] = len(person_ids)
+                person_ids.append(row[0])
+
+    movie_ids = []
+    movie_index = {}
+    for chunk in chunks(os.path.join(directory, "movies.csv"), chunk_size):
+        for row in chunk:
+            if row[0] not in movie_index:
+                movie_index[row[0]] = len(movie_ids)
+                movie_ids.append(row[0])
+
+    # Star pairs go straight into int arrays, 8 bytes per row
+    edge_people = array("i")
+    edge_movies = array("i")
+    for chunk in chunks(os.path.join(directory, "stars.csv"), chunk_size):
+        for person_id, movie_id in chunk:
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is not None and movie is not None:
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+    graph = CompactGraph.from_edge_arrays(
+        person_ids, movie_ids, edge_people, edge_movies,
+        person_index=person_index, movie_index=movie_index
+    )
+    return StreamedData(directory, graph, chunk_size)
+
+
+class LazyColumn():
+    """
+    One side table column, filled on first access by its owner.
+    """
+
+    def __init__(self, data, name):
+        self.data = data
+        self.name = name
+
+    def values(self):
+        return self.data.side_table()[self.name]
+
+    def __len__(self):
+        return len(self.values())
+
+    def __getitem__(self, i):
+        return self.values()[i]
+
+    def append(self, value):
+        self.values().append(value)
+
+
+class LazyNames(Mapping):
+    """
+    Stand-in for the `names` dict of degrees.py, built on first lookup.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, name):
+        return self.data.side_table()["names"][name]
+
+    def __iter__(self):
+        return iter(self.data.side_table()["names"])
+
+    def __len__(self):
+        return len(self.data.side_table()["names"])
+
+    def add(self, name, person_id):
+        self.data.side_table()["names"].setdefault(name, set()).add(person_id)
+
+
+class StreamedData(GraphData):
+    """
+    A CompactGraph loaded by streaming, with its names, births, titles
+    and years read back from the CSV files only when first needed.
+    """
+
+    def __init__(self, directory, graph, chunk_size=CHUNK_SIZE):
+        self.directory = directory
+        self.graph = graph
+        self.chunk_size = chunk_size
+        self.table = None
+
+        self.person_names = LazyColumn(self, "person_names")
+        self.person_births = LazyColumn(self, "person_births")
+        self.movie_titles = LazyColumn(self, "movie_titles")
+        self.movie_years = LazyColumn(self, "movie_years")
+
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+        self.names = LazyNames(self)
+
+    def apply(self, people=(), movies=(), stars=()):
+        # New rows must land after the CSV rows in the side table
+        self.side_table()
+        GraphData.apply(self, people, movies, stars)
+
+    def side_table(self):
+        """
+        Returns the side table, reading it from the CSV files first if
+        needed. Births and years repeat heavily, so they are interned.
+        """
+        if self.table is not None:
+            return self.table
+
+        graph = self.graph
+        table = {
+            "person_names": [None] * len(graph.person_ids),
+            "person_births": [None] * len(graph.person_ids),
+            "movie_titles": [None] * len(graph.movie_ids),
+            "movie_years": [None] * len(graph.movie_ids),
+            "names": {}
+        }
+        for chunk in chunks(os.path.join(self.directory, "people.csv"), self.chunk_size):
+            for person_id, name, birth in chunk:
+                p = graph.person_index[person_id]
+                if table["person_names"][p] is None:
+                    table["person_names"][p] = name
+                    table["person_births"][p] = sys.intern(birth)
+                    table["names"].setdefault(name.lower(), set()).add(person_id)
+        for chunk in chunks(os.path.join(self.directory, "movies.csv"), self.chunk_size):
+            for movie_id, title, year in chunk:
+                m = graph.movie_index[movie_id]
+                if table["movie_titles"][m] is None:
+                    table["movie_titles"][m] = title
+                    table["movie_years"][m] = sys.intern(year)
+
+        self.table = table
+        return table
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +39,141 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a companion index of the
+    states it holds so push, pop and membership checks are all O(1).
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def _pop(self):
+        return self.frontier.pop()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self._pop()
+            count = self.states[node.state] - 1
+            if count:
+                self.states[node.state] = count
+            else:
+                del self.states[node.state]
+            return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def _pop(self):
+        return self.frontier.popleft()
+
+
+class SearchStats():
+    """
+    Counters describing the work done by a single search.
+    """
+
+    def __init__(self):
+        self.nodes_expanded = 0
+        self.peak_frontier = 0
+
+    def observe_frontier(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def __repr__(self):
+        return (f"SearchStats(nodes_expanded={self.nodes_expanded}, "
+                f"peak_frontier={self.peak_frontier})")
+
+
+def bidirectional_search(source, target, neighbors, stats=None):
+    """
+    Breadth-first search grown from both the source and the target,
+    expanding one full layer of the smaller frontier at a time.
+
+    `neighbors` maps a state to (action, state) pairs and must be
+    symmetric. Returns a list of (action, state) pairs leading from the
+    source to the target, or None if the two are not connected.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if source == target:
+        return []
+
+    # Each side maps a reached state to the (action, state) step
+    # leading back towards the side's root
+    parents_forward = {source: None}
+    parents_backward = {target: None}
+    frontier_forward = [source]
+    frontier_backward = [target]
+
+    while frontier_forward and frontier_backward:
+        stats.observe_frontier(len(frontier_forward) + len(frontier_backward))
+
+        # Expanding the smaller layer keeps both search balls small
+        forward = len(frontier_forward) <= len(frontier_backward)
+        if forward:
+            layer, parents, other = frontier_forward, parents_forward, parents_backward
+        else:
+            layer, parents, other = frontier_backward, parents_backward, parents_forward
+
+        next_layer = []
+        for state in layer:
+            stats.nodes_expanded += 1
+            for action, neighbor in neighbors(state):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (action, state)
+
+                # Once the two searches touch, every meeting found in this
+                # layer has the same length, so the first one is optimal
+                if neighbor in other:
+                    return _join_paths(parents_forward, parents_backward, neighbor)
+                next_layer.append(neighbor)
+
+        if forward:
+            frontier_forward = next_layer
+        else:
+            frontier_backward = next_layer
+
+    return None
+
+
+def _join_paths(parents_forward, parents_backward, meeting):
+    """
+    Builds the source-to-target path through the meeting state.
+    """
+    path = []
+    state = meeting
+    while parents_forward[state] is not None:
+        action, previous = parents_forward[state]
+        path.append((action, state))
+        state = previous
+    path.reverse()
+
+    # Neighbors are symmetric, so the backward step's action links
+    # the pair in either direction
+    state = meeting
+    while parents_backward[state] is not None:
+        action, following = parents_backward[state]
+        path.append((action, following))
+        state = following
+    return path
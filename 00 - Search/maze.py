@@ -1,10 +1,18 @@
+import argparse
+import heapq
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
@@ -39,96 +47,401 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a companion index of the
+    states it holds so push, pop and membership checks are all O(1).
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def __len__(self):
+        return len(self.frontier)
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def _pop(self):
+        return self.frontier.pop()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self._pop()
+            count = self.states[node.state] - 1
+            if count:
+                self.states[node.state] = count
+            else:
+                del self.states[node.state]
+            return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def _pop(self):
+        return self.frontier.popleft()
+
+
+class PriorityFrontier(DequeStackFrontier):
+    """
+    Binary heap frontier: remove returns the node added with the lowest
+    priority, breaking ties in insertion order.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.counter = 0
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, self.counter, node))
+        self.counter += 1
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def _pop(self):
+        return heapq.heappop(self.frontier)[-1]
+
+
+class CellSet():
+    """
+    Bitmap of maze cells, one bit per cell, accepting either (row, col)
+    tuples or flat cell ids.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.size = width * height
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _id(self, cell):
+        if isinstance(cell, tuple):
+            row, col = cell
+            return row * self.width + col
+        return cell
+
+    def __contains__(self, cell):
+        cell = self._id(cell)
+        return bool(self.bits[cell >> 3] & (1 << (cell & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for cell in np.flatnonzero(self.to_array()):
+            yield divmod(int(cell), self.width)
+
+    def add(self, cell):
+        cell = self._id(cell)
+        mask = 1 << (cell & 7)
+        if not self.bits[cell >> 3] & mask:
+            self.bits[cell >> 3] |= mask
+            self.count += 1
+
+    @classmethod
+    def from_array(cls, width, height, mask):
+        """Builds a set from a flat NumPy boolean array of cells."""
+        cells = cls(width, height)
+        cells.bits = bytearray(np.packbits(mask, bitorder="little").tobytes())
+        cells.count = int(np.count_nonzero(mask))
+        return cells
+
+    def to_array(self):
+        """Returns the set as a flat NumPy boolean array."""
+        bits = np.frombuffer(bytes(self.bits), dtype=np.uint8)
+        return np.unpackbits(bits, bitorder="little")[:self.size].astype(bool)
+
+
+STRATEGIES = ("dfs", "bfs", "greedy", "astar", "wavefront", "jps")
+
+# Row and column offsets of each move
+MOVES = (("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1))
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+OFFSETS = {action: (dr, dc) for action, dr, dc in MOVES}
+
+# Narrower wavefront layers are expanded without NumPy
+WAVEFRONT_MIN_LAYER = 32
+
+# Cell kinds when rendering, and their image colors in the same order
+RENDER_CODES = ("empty", "wall", "start", "goal", "solution", "explored")
+RENDER_COLORS = np.array([
+    (237, 240, 252), (40, 40, 40), (255, 0, 0),
+    (0, 171, 28), (220, 235, 113), (212, 97, 85)
+], dtype=np.uint8)
+
+
+def read_grid(filename):
+    """
+    Reads a maze file into a boolean wall grid, plus lists of the (row, col)
+    cells marked A and B. Anything but A, B or space is a wall.
+
+    The file is read a line at a time as bytes, so no more than one row
+    exists as text while the grid is filled in.
+    """
+    # Determine height and width of maze
+    height = width = 0
+    with open(filename) as f:
+        for line in f:
+            height += 1
+            width = max(width, len(line.rstrip("\n")))
+
+    # Short lines are padded with open cells
+    walls = np.zeros((height, width), dtype=bool)
+    starts = []
+    goals = []
+    with open(filename) as f:
+        for i, line in enumerate(f):
+
+            # One byte per character, non-ASCII characters becoming "?" walls
+            row = np.frombuffer(line.rstrip("\n").encode("ascii", "replace"), dtype=np.uint8)
+            walls[i, :row.size] = (row != ord(" ")) & (row != ord("A")) & (row != ord("B"))
+            starts.extend((i, int(j)) for j in np.flatnonzero(row == ord("A")))
+            goals.extend((i, int(j)) for j in np.flatnonzero(row == ord("B")))
+    return walls, starts, goals
+
+
+def component_labels(walls):
+    """
+    Labels the 4-connected open regions of a wall grid. Returns a flat
+    array giving each open cell the smallest cell id in its region, and
+    each wall -1.
+
+    Regions are merged with a vectorized union-find: every round hooks
+    the larger root of each edge that still spans two regions onto the
+    smaller one, then compresses every chain to its root.
+    """
+    ids = np.arange(walls.size).reshape(walls.shape)
+    open_cells = ~walls
+    across = open_cells[:, :-1] & open_cells[:, 1:]
+    down = open_cells[:-1, :] & open_cells[1:, :]
+    u = np.concatenate([ids[:, :-1][across], ids[:-1, :][down]])
+    v = np.concatenate([ids[:, 1:][across], ids[1:, :][down]])
+
+    parent = np.arange(walls.size)
+    while u.size:
+        root_u = parent[u]
+        root_v = parent[v]
+        spanning = root_u != root_v
+        u, v = u[spanning], v[spanning]
+        root_u, root_v = root_u[spanning], root_v[spanning]
+        if not u.size:
+            break
+        np.minimum.at(parent, np.maximum(root_u, root_v), np.minimum(root_u, root_v))
+        while True:
+            grandparent = parent[parent]
+            if (grandparent == parent).all():
+                break
+            parent = grandparent
+
+    parent[walls.reshape(-1)] = -1
+    return parent
+
+
 class Maze():
 
-    def __init__(self, filename):
+    def __init__(self, filename, costs=None):
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+        # Read file into a wall grid and the cells marked A and B
+        walls, starts, goals = read_grid(filename)
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        if len(starts) != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if len(goals) != 1:
             raise Exception("maze must have exactly one goal")
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        self.setup(walls, starts[0], goals[0], costs)
+
+
+    @classmethod
+    def from_grid(cls, walls, start, goal, costs=None):
+        """
+        Builds a maze from an existing wall grid, without copying it, with
+        the given (row, col) start and goal.
+        """
+        maze = cls.__new__(cls)
+        maze.setup(walls, start, goal, costs)
+        return maze
+
+
+    def setup(self, walls, start, goal, costs=None):
+        self.height, self.width = walls.shape
+        self.walls = walls
+        self.start = start
+        self.goal = goal
+
+        # Flat views for fast per-cell lookups by cell id
+        self.wall_cells = memoryview(self.walls.reshape(-1))
+
+        # Optional cost of entering each cell, 1 everywhere by default
+        self.costs = None
+        self.cost_cells = None
+        self.min_cost = 1
+        if costs is not None:
+            self.costs = np.asarray(costs, dtype=float)
+            if self.costs.shape != self.walls.shape:
+                raise Exception("cost grid must match the maze size")
+            open_costs = self.costs[~self.walls]
+            if (open_costs <= 0).any():
+                raise Exception("cell costs must be positive")
+            if open_costs.size:
+                self.min_cost = float(open_costs.min())
+            self.cost_cells = memoryview(self.costs.reshape(-1))
 
         self.solution = None
 
 
+    def cell_codes(self, show_solution=True, show_explored=False):
+        """
+        Returns a grid of RENDER_CODES indices, one per cell, for drawing.
+        Solution and explored cells are only marked once solved.
+        """
+        codes = np.where(self.walls, RENDER_CODES.index("wall"),
+                         RENDER_CODES.index("empty")).astype(np.uint8)
+        if self.solution is not None:
+            if show_explored:
+                explored = self.explored.to_array().reshape(self.walls.shape)
+                codes[explored & ~self.walls] = RENDER_CODES.index("explored")
+            if show_solution and self.solution[1]:
+                rows, cols = np.array(self.solution[1]).T
+                codes[rows, cols] = RENDER_CODES.index("solution")
+        codes[self.start] = RENDER_CODES.index("start")
+        codes[self.goal] = RENDER_CODES.index("goal")
+        return codes
+
+
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
-        print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
-        print()
+        """Prints the maze and any solution in a single write."""
+        chars = np.array([ord(c) for c in " █AB* "], dtype=np.uint32)
 
+        # Code points with a newline column, decoded as one string
+        grid = np.full((self.height, self.width + 1), ord("\n"), dtype=np.uint32)
+        grid[:, :-1] = chars[self.cell_codes()]
+        text = grid.astype("<u4").tobytes().decode("utf-32-le")
+        sys.stdout.write(f"\n{text}\n")
 
-    def neighbors(self, state):
+
+    def cell_id(self, state):
+        """Returns the flat id of a (row, col) cell."""
         row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
+        return row * self.width + col
+
+
+    def cell_state(self, cell):
+        """Returns the (row, col) of a flat cell id."""
+        return divmod(cell, self.width)
+
+
+    def neighbors(self, state):
+        return [
+            (action, self.cell_state(cell))
+            for action, cell in self.neighbor_ids(self.cell_id(state))
         ]
 
+
+    def neighbor_ids(self, cell):
+        """Returns (action, cell id) pairs for the open cells next to a cell."""
+        width = self.width
+        walls = self.wall_cells
+        row, col = divmod(cell, width)
+
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        if row > 0 and not walls[cell - width]:
+            result.append(("up", cell - width))
+        if row < self.height - 1 and not walls[cell + width]:
+            result.append(("down", cell + width))
+        if col > 0 and not walls[cell - 1]:
+            result.append(("left", cell - 1))
+        if col < width - 1 and not walls[cell + 1]:
+            result.append(("right", cell + 1))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def neighbor_table(self, cells):
+        """
+        Vectorized neighbors of an array of cell ids, as an array with one
+        row per cell and one column per move in MOVES order. Moves into a
+        wall or off the grid are -1.
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        rows, cols = np.divmod(cells, self.width)
+        walls = self.walls.reshape(-1)
+
+        table = np.full((cells.size, len(MOVES)), -1, dtype=np.int64)
+        for k, (_, dr, dc) in enumerate(MOVES):
+            r = rows + dr
+            c = cols + dc
+            valid = (r >= 0) & (r < self.height) & (c >= 0) & (c < self.width)
+            target = r * self.width + c
+            valid[valid] &= ~walls[target[valid]]
+            table[valid, k] = target[valid]
+        return table
+
+
+    def neighbor_cells(self, cells):
+        """
+        Vectorized neighbors of an array of cell ids. Returns parallel
+        arrays of source cells and open neighbor cells, one entry per move.
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        table = self.neighbor_table(cells)
+        valid = table >= 0
+        sources = np.broadcast_to(cells[:, None], table.shape)[valid]
+        return sources, table[valid]
+
+
+    def cost(self, cell):
+        """Returns the cost of stepping into a cell, by cell id."""
+        if self.cost_cells is None:
+            return 1
+        return self.cost_cells[cell]
+
+
+    def heuristic(self, cell):
+        """Manhattan distance to the goal, scaled so it never overestimates."""
+        row, col = divmod(cell, self.width)
+        return (abs(row - self.goal[0]) + abs(col - self.goal[1])) * self.min_cost
+
+
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists, using one of STRATEGIES:
+        depth-first, breadth-first, greedy best-first, A*, layer-at-a-time
+        breadth-first or jump point search.
+
+        Search runs over flat cell ids; `explored` is a CellSet bitmap.
+        """
+        if strategy not in STRATEGIES:
+            raise Exception(f"unknown strategy: {strategy}")
+        if strategy in ("greedy", "astar"):
+            return self.solve_informed(greedy=strategy == "greedy")
+        if strategy == "wavefront":
+            return self.solve_wavefront()
+        if strategy == "jps":
+            return self.solve_jps()
 
         # Keep track of number of states explored
         self.num_explored = 0
+        goal = self.cell_id(self.goal)
 
         # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        start = Node(state=self.cell_id(self.start), parent=None, action=None)
+        frontier = DequeStackFrontier() if strategy == "dfs" else DequeQueueFrontier()
         frontier.add(start)
 
         # Initialize an empty explored set
-        self.explored = set()
+        self.explored = CellSet(self.width, self.height)
 
         # Keep looping until solution found
         while True:
@@ -142,88 +455,530 @@ class Maze():
             self.num_explored += 1
 
             # If node is the goal, then we have a solution
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+            if node.state == goal:
+                self.set_solution(node)
                 return
 
             # Mark node as explored
             self.explored.add(node.state)
 
             # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
+            for action, state in self.neighbor_ids(node.state):
                 if not frontier.contains_state(state) and state not in self.explored:
                     child = Node(state=state, parent=node, action=action)
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
+    def solve_informed(self, greedy=False):
+        """
+        Finds a solution with A* search, ordering the frontier by path cost
+        plus heuristic, or with greedy best-first search by heuristic alone.
+        """
+        self.num_explored = 0
+        self.explored = CellSet(self.width, self.height)
+        goal = self.cell_id(self.goal)
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
+        start = Node(state=self.cell_id(self.start), parent=None, action=None, cost=0)
+        frontier = PriorityFrontier()
+        frontier.add(start, self.heuristic(start.state))
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+        # Cheapest known cost to reach each state, for A*
+        best = {start.state: 0}
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+        while True:
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+            if frontier.empty():
+                raise Exception("no solution")
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+            # Skip stale entries for states already reached more cheaply
+            node = frontier.remove()
+            if node.state in self.explored:
+                continue
+            self.num_explored += 1
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+            if node.state == goal:
+                self.set_solution(node)
+                return
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+            self.explored.add(node.state)
+
+            for action, state in self.neighbor_ids(node.state):
+                if state in self.explored:
+                    continue
+                cost = node.cost + self.cost(state)
+                if greedy:
+                    if frontier.contains_state(state):
+                        continue
+                    priority = self.heuristic(state)
+                else:
+                    if cost >= best.get(state, float("inf")):
+                        continue
+                    best[state] = cost
+                    priority = cost + self.heuristic(state)
+                child = Node(state=state, parent=node, action=action, cost=cost)
+                frontier.add(child, priority)
+
+
+    def solve_wavefront(self):
+        """
+        Breadth-first search that expands a whole layer per step with NumPy.
+
+        Each layer's neighbors come from index shifts over the frontier
+        array, and the path is recovered by walking down the distance
+        field. Layers narrower than WAVEFRONT_MIN_LAYER, as in corridors,
+        are expanded cell by cell, where NumPy's per-call cost dominates. Cells are ranked in the order a node-at-a-time BFS would
+        discover them, and ties in the descent go to the lowest rank, so
+        the solution and explored cells match solve("bfs") exactly.
+        """
+        size = self.width * self.height
+        start = self.cell_id(self.start)
+        goal = self.cell_id(self.goal)
+
+        distance = np.full(size, -1, dtype=np.int32)
+        rank = np.full(size, -1, dtype=np.int64)
+        distance_cells = memoryview(distance)
+        rank_cells = memoryview(rank)
+        distance[start] = 0
+        rank[start] = 0
+        frontier = [start]
+        discovered = 1
+        layer = 0
+
+        while distance_cells[goal] < 0:
+
+            # If nothing left in frontier, then no path
+            if len(frontier) == 0:
+                self.explored = CellSet.from_array(self.width, self.height, distance >= 0)
+                self.num_explored = len(self.explored)
+                raise Exception("no solution")
+
+            layer += 1
+            if len(frontier) < WAVEFRONT_MIN_LAYER:
+                targets = []
+                for parent in frontier:
+                    for _, neighbor in self.neighbor_ids(parent):
+                        if distance_cells[neighbor] < 0:
+                            distance_cells[neighbor] = layer
+                            rank_cells[neighbor] = discovered
+                            discovered += 1
+                            targets.append(neighbor)
+                frontier = targets
+                continue
+
+            # Neighbors in parent order, then move order, keeping first sightings
+            targets = self.neighbor_table(frontier).ravel()
+            targets = targets[targets >= 0]
+            targets = targets[distance[targets] < 0]
+            targets, first = np.unique(targets, return_index=True)
+            targets = targets[np.argsort(first)]
+
+            distance[targets] = layer
+            rank[targets] = discovered + np.arange(targets.size)
+            discovered += targets.size
+            frontier = targets if targets.size >= WAVEFRONT_MIN_LAYER else targets.tolist()
+
+        # Everything dequeued before the goal counts as explored
+        explored = (distance >= 0) & (distance < layer)
+        explored |= (distance == layer) & (rank < rank_cells[goal])
+        self.explored = CellSet.from_array(self.width, self.height, explored)
+        self.num_explored = len(self.explored) + 1
+
+        # Walk down the distance field, preferring the earliest-ranked parent
+        actions = []
+        cells = []
+        cell = goal
+        while cell != start:
+            best = None
+            for action, neighbor in self.neighbor_ids(cell):
+                if distance_cells[neighbor] == distance_cells[cell] - 1:
+                    if best is None or rank_cells[neighbor] < rank_cells[best[1]]:
+                        best = (OPPOSITE[action], neighbor)
+            actions.append(best[0])
+            cells.append(self.cell_state(cell))
+            cell = best[1]
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def distance_field(self):
+        """
+        Returns the cost of the cheapest path from every cell to the goal
+        as a flat float array, inf where the goal cannot be reached.
+        Uniform mazes are swept a layer at a time; weighted ones run
+        Dijkstra's algorithm backwards from the goal.
+        """
+        goal = self.cell_id(self.goal)
+        distance = np.full(self.width * self.height, np.inf)
+        distance[goal] = 0
+
+        if self.cost_cells is None:
+            frontier = np.array([goal], dtype=np.int64)
+            layer = 0
+            while frontier.size:
+                layer += 1
+                targets = self.neighbor_table(frontier).ravel()
+                targets = targets[targets >= 0]
+                frontier = np.unique(targets[distance[targets] == np.inf])
+                distance[frontier] = layer
+            return distance
+
+        # Stepping from a cell into its neighbor costs the neighbor's cost
+        heap = [(0, goal)]
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d > distance[cell]:
+                continue
+            step = d + self.cost(cell)
+            for _, neighbor in self.neighbor_ids(cell):
+                if step < distance[neighbor]:
+                    distance[neighbor] = step
+                    heapq.heappush(heap, (step, neighbor))
+        return distance
+
+
+    def is_open(self, row, col):
+        """True if (row, col) is inside the maze and not a wall."""
+        return (0 <= row < self.height and 0 <= col < self.width
+                and not self.wall_cells[row * self.width + col])
+
+
+    def jump_tables(self):
+        """
+        For jump point search, precomputes where a horizontal scan from
+        each cell must stop: the nearest wall, goal, or cell with a forced
+        vertical neighbor at or beyond it. Returns flat memoryviews of
+        stop columns keyed by direction, 1 for right and -1 for left.
+        """
+        height, width = self.walls.shape
+        padded = np.pad(self.walls, 1, constant_values=True)
+        goal = np.zeros_like(self.walls)
+        goal[self.goal] = True
+        columns = np.arange(width, dtype=np.int32)
+
+        tables = {}
+        for dx in (1, -1):
+
+            # Moving by dx, a vertical neighbor is forced when the cell
+            # diagonally behind it is blocked
+            forced = ~self.walls & (
+                (~padded[:-2, 1:-1] & padded[:-2, 1 - dx:width + 1 - dx])
+                | (~padded[2:, 1:-1] & padded[2:, 1 - dx:width + 1 - dx])
+            )
+            stop = self.walls | forced | goal
+            if dx == 1:
+                index = np.where(stop, columns, width)
+                index = np.minimum.accumulate(index[:, ::-1], axis=1)[:, ::-1]
+            else:
+                index = np.where(stop, columns, -1)
+                index = np.maximum.accumulate(index, axis=1)
+            tables[dx] = memoryview(np.ascontiguousarray(index, dtype=np.int32).reshape(-1))
+        return tables
+
+
+    def jump_horizontal(self, cell, dx, tables):
+        """Returns the next jump point left or right of a cell, or None."""
+        row, col = divmod(cell, self.width)
+        col += dx
+        if not 0 <= col < self.width:
+            return None
+        stop = tables[dx][row * self.width + col]
+        if not 0 <= stop < self.width or self.wall_cells[row * self.width + stop]:
+            return None
+        return row * self.width + stop
+
+
+    def jump_vertical(self, cell, dy, tables, goal):
+        """
+        Returns the next jump point above or below a cell, or None. A cell
+        is a jump point if a horizontal scan from it finds one.
+        """
+        row = cell // self.width
+        step = dy * self.width
+        while True:
+            row += dy
+            cell += step
+            if not 0 <= row < self.height or self.wall_cells[cell]:
+                return None
+            if cell == goal:
+                return cell
+            if (self.jump_horizontal(cell, 1, tables) is not None
+                    or self.jump_horizontal(cell, -1, tables) is not None):
+                return cell
+
+
+    def jump_directions(self, node):
+        """
+        Directions worth scanning from a jump point, given the direction
+        it was reached in. Paths turn vertical as early as possible, so
+        horizontal travel only turns at forced neighbors.
+        """
+        if node.action is None:
+            return [action for action, _, _ in MOVES]
+        if node.action in ("up", "down"):
+            return [node.action, "left", "right"]
+
+        directions = [node.action]
+        row, col = self.cell_state(node.state)
+        behind = col - OFFSETS[node.action][1]
+        for action in ("up", "down"):
+            r = row + OFFSETS[action][0]
+            if self.is_open(r, col) and not self.is_open(r, behind):
+                directions.append(action)
+        return directions
+
+
+    def solve_jps(self):
+        """
+        Finds a shortest solution with jump point search: A* over jump
+        points only, scanning straight runs of cells between them instead
+        of queueing every cell. Needs uniform cell costs.
+
+        Only jump points are counted in num_explored and explored.
+        """
+        if self.costs is not None:
+            raise Exception("jump point search needs uniform cell costs")
+
+        self.num_explored = 0
+        self.explored = CellSet(self.width, self.height)
+        goal = self.cell_id(self.goal)
+        tables = self.jump_tables()
+
+        start = Node(state=self.cell_id(self.start), parent=None, action=None, cost=0)
+        frontier = PriorityFrontier()
+        frontier.add(start, self.heuristic(start.state))
+        best = {start.state: 0}
+
+        while True:
+
+            if frontier.empty():
+                raise Exception("no solution")
+
+            node = frontier.remove()
+            if node.state in self.explored:
+                continue
+            self.num_explored += 1
+
+            if node.state == goal:
+                self.set_jump_solution(node)
+                return
+
+            self.explored.add(node.state)
 
-                # Empty cell
+            for action in self.jump_directions(node):
+                dr, dc = OFFSETS[action]
+                if dr:
+                    state = self.jump_vertical(node.state, dr, tables, goal)
                 else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+                    state = self.jump_horizontal(node.state, dc, tables)
+                if state is None or state in self.explored:
+                    continue
+                cost = node.cost + abs(state - node.state) // (self.width if dr else 1)
+                if cost >= best.get(state, float("inf")):
+                    continue
+                best[state] = cost
+                child = Node(state=state, parent=node, action=action, cost=cost)
+                frontier.add(child, cost + self.heuristic(state))
+
+
+    def set_jump_solution(self, node):
+        """Records a solution, filling in the straight runs between jump points."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            dr, dc = OFFSETS[node.action]
+            row, col = self.cell_state(node.state)
+            for _ in range(node.cost - node.parent.cost):
+                actions.append(node.action)
+                cells.append((row, col))
+                row -= dr
+                col -= dc
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def set_solution(self, node):
+        """Records the actions and (row, col) cells leading to a goal node."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(self.cell_state(node.state))
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        """
+        Saves the maze as an image with `cell_size` pixel cells, which may
+        be as small as 1. The pixels are built as one NumPy RGB array.
+        """
+        from PIL import Image
+
+        # Keep at least one filled pixel per cell
+        cell_border = max(0, min(cell_border, (cell_size - 1) // 2))
+        offsets = np.arange(cell_size)
+        inside = (offsets >= cell_border) & (offsets <= cell_size - cell_border)
+
+        # Color each cell, then spread it over its block of pixels
+        colors = RENDER_COLORS[self.cell_codes(show_solution, show_explored)]
+        mask = inside[:, None] & inside[None, :]
+        pixels = colors[:, None, :, None, :] * mask[None, :, None, :, None]
+        pixels = pixels.reshape(self.height * cell_size, self.width * cell_size, 3)
+
+        Image.fromarray(pixels, "RGB").save(filename)
+
+
+class MazeMap():
+    """
+    A maze file loaded once to answer many (start, goal) queries, with
+    any A and B marks treated as open cells.
+
+    Connected-component labels answer unreachable queries without a
+    search, and goals given a precomputed distance field are answered
+    by walking down the field.
+    """
+
+    def __init__(self, filename, costs=None, goals=()):
+        self.walls, _, _ = read_grid(filename)
+        self.height, self.width = self.walls.shape
+
+        # Validate the cost grid the same way a Maze does
+        self.costs = Maze.from_grid(self.walls, None, None, costs).costs
+
+        self.labels = component_labels(self.walls)
+        self.fields = {}
+        for goal in goals:
+            self.add_goal(goal)
+
+
+    def maze(self, start, goal):
+        """Returns a Maze over this map's grid with the given start and goal."""
+        for name, (row, col) in (("start", start), ("goal", goal)):
+            if not (0 <= row < self.height and 0 <= col < self.width) or self.walls[row, col]:
+                raise Exception(f"{name} {(row, col)} is not an open cell")
+        return Maze.from_grid(self.walls, tuple(start), tuple(goal), self.costs)
+
+
+    def connected(self, start, goal):
+        """True if a path exists between two open (row, col) cells."""
+        return (self.labels[start[0] * self.width + start[1]]
+                == self.labels[goal[0] * self.width + goal[1]])
+
+
+    def add_goal(self, goal):
+        """Precomputes the distance field of a goal for later queries."""
+        goal = tuple(goal)
+        self.fields[goal] = self.maze(goal, goal).distance_field()
+
+
+    def solve(self, start, goal, strategy="astar"):
+        """
+        Returns the (actions, cells) solution from start to goal, in the
+        form of Maze.solution, or None if there is none.
+        """
+        start = tuple(start)
+        goal = tuple(goal)
+        maze = self.maze(start, goal)
+        if not self.connected(start, goal):
+            return None
+        if start == goal:
+            return ([], [])
+        if goal in self.fields:
+            return self.follow_field(maze, self.fields[goal])
+        maze.solve(strategy)
+        return maze.solution
+
+
+    def follow_field(self, maze, distance):
+        """Walks from the start of `maze` down a goal's distance field."""
+        actions = []
+        cells = []
+        cell = maze.cell_id(maze.start)
+        goal = maze.cell_id(maze.goal)
+        while cell != goal:
+            action, cell = min(
+                maze.neighbor_ids(cell),
+                key=lambda neighbor: maze.cost(neighbor[1]) + distance[neighbor[1]]
+            )
+            actions.append(action)
+            cells.append(maze.cell_state(cell))
+        return (actions, cells)
+
+
+    def solve_many(self, queries, strategy="astar", processes=None, chunksize=64):
+        """
+        Answers a batch of (start, goal) queries, returning their solutions
+        in order. With `processes`, the queries are spread over that many
+        worker processes, each holding its own copy of the map.
+        """
+        queries = [(tuple(start), tuple(goal)) for start, goal in queries]
+        if not processes:
+            return [self.solve(start, goal, strategy) for start, goal in queries]
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=load_worker,
+                                 initargs=(self,)) as executor:
+            return list(executor.map(solve_query, queries, [strategy] * len(queries),
+                                     chunksize=chunksize))
+
+
+# The map held by each solve_many worker process
+worker_map = None
+
+
+def load_worker(maze_map):
+    global worker_map
+    worker_map = maze_map
+
+
+def solve_query(query, strategy):
+    start, goal = query
+    return worker_map.solve(start, goal, strategy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a maze.")
+    parser.add_argument("maze", help="maze text file")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="dfs")
+    parser.add_argument("--image", default="maze.png", help="image file to write")
+    parser.add_argument("--no-image", action="store_true", help="do not write an image")
+    parser.add_argument("--cell-size", type=int, default=50, help="image pixels per cell")
+    parser.add_argument("--quiet", action="store_true", help="do not print the maze")
+    parser.add_argument("--time", action="store_true",
+                        help="report load, solve and render times on stderr")
+    args = parser.parse_args()
+
+    timings = {}
+    start = time.perf_counter()
+    m = Maze(args.maze)
+    timings["load"] = time.perf_counter() - start
+
+    if not args.quiet:
+        print("Maze:")
+        m.print()
+    print("Solving...")
+    start = time.perf_counter()
+    m.solve(args.strategy)
+    timings["solve"] = time.perf_counter() - start
+    print("States Explored:", m.num_explored)
+    if not args.quiet:
+        print("Solution:")
+        m.print()
+
+    if not args.no_image:
+        start = time.perf_counter()
+        m.output_image(args.image, show_explored=True, cell_size=args.cell_size)
+        timings["render"] = time.perf_counter() - start
+
+    if args.time:
+        for stage, seconds in timings.items():
+            print(f"{stage}: {seconds:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark harness for the maze search strategies.
+
+Generates open, cluttered and corridor-style maze files, solves each with
+every selected strategy, and prints one JSON document with the nodes
+expanded, wall time and solution length per map and strategy.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from maze import STRATEGIES, Maze
+
+MAPS = ("open", "cluttered", "corridor")
+
+
+def generate_open(size, rng):
+    """A room with a sprinkling of single-cell pillars."""
+    grid = [[" "] * size for _ in range(size)]
+    for _ in range(size * size // 100):
+        grid[rng.randrange(size)][rng.randrange(size)] = "#"
+    return grid
+
+
+def generate_cluttered(size, rng, density=0.3):
+    """Walls placed independently at random in `density` of the cells."""
+    return [["#" if rng.random() < density else " " for _ in range(size)]
+            for _ in range(size)]
+
+
+def generate_corridor(size, rng):
+    """
+    A perfect maze of one-cell-wide corridors, carved by a randomized
+    depth-first walk over the cells at even coordinates.
+    """
+    grid = [["#"] * size for _ in range(size)]
+    grid[0][0] = " "
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        steps = [(dr, dc) for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                 if 0 <= row + dr < size and 0 <= col + dc < size
+                 and grid[row + dr][col + dc] == "#"]
+        if not steps:
+            stack.pop()
+            continue
+        dr, dc = rng.choice(steps)
+        grid[row + dr // 2][col + dc // 2] = " "
+        grid[row + dr][col + dc] = " "
+        stack.append((row + dr, col + dc))
+    return grid
+
+
+def generate(path, kind, size, seed=0):
+    """
+    Writes a `size` by `size` maze of the given kind to `path`, with the
+    start and goal in opposite corners. Cluttered maps are redrawn until
+    the goal is reachable.
+    """
+    rng = random.Random(seed)
+    while True:
+        if kind == "open":
+            grid = generate_open(size, rng)
+        elif kind == "cluttered":
+            grid = generate_cluttered(size, rng)
+        elif kind == "corridor":
+            grid = generate_corridor(size, rng)
+        else:
+            raise ValueError(f"unknown map: {kind}")
+
+        # Corridor cells sit on even coordinates
+        last = size - 1 if kind != "corridor" else (size - 1) // 2 * 2
+        grid[0][0] = "A"
+        grid[last][last] = "B"
+        with open(path, "w") as f:
+            f.write("\n".join("".join(row) for row in grid) + "\n")
+
+        maze = Maze(path)
+        try:
+            maze.solve("wavefront")
+        except Exception:
+            continue
+        return
+
+
+def run_strategy(path, strategy):
+    """
+    Solves the maze at `path` with `strategy`, returning a dict of
+    measurements. Parsing the file is not included in the time.
+    """
+    maze = Maze(path)
+    start = time.perf_counter()
+    maze.solve(strategy)
+    seconds = time.perf_counter() - start
+    return {
+        "strategy": strategy,
+        "seconds": seconds,
+        "nodes_expanded": maze.num_explored,
+        "solution_length": len(maze.solution[0]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze search strategies.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--maps", default=",".join(MAPS),
+                        help=f"comma-separated subset of: {', '.join(MAPS)}")
+    parser.add_argument("--strategies", default="bfs,wavefront,astar,jps",
+                        help=f"comma-separated subset of: {', '.join(STRATEGIES)}")
+    args = parser.parse_args()
+
+    maps = args.maps.split(",")
+    strategies = args.strategies.split(",")
+    for name in maps:
+        if name not in MAPS:
+            sys.exit(f"Unknown map: {name}")
+    for name in strategies:
+        if name not in STRATEGIES:
+            sys.exit(f"Unknown strategy: {name}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in maps:
+            path = os.path.join(directory, f"{kind}.txt")
+            generate(path, kind, args.size, args.seed)
+            for strategy in strategies:
+                result = run_strategy(path, strategy)
+                result["map"] = kind
+                results.append(result)
+
+    json.dump({"config": vars(args), "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
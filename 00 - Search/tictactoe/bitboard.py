@@ -0,0 +1,141 @@
+"""
+Bitboard engine for Tic Tac Toe.
+
+A position is two 9-bit ints, the cells held by X and the cells held by O,
+with bit 3 * i + j standing for cell (i, j). Turn order, wins, legal moves
+and board symmetries are precomputed for all 512 bit patterns, so each
+check is a table lookup.
+"""
+
+from array import array
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0x1FF
+
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6))
+WIN_MASKS = tuple(sum(1 << k for k in line) for line in LINES)
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board, each as a tuple
+    giving the cell index whose contents land on each square.
+    """
+    maps = []
+    for k in range(4):
+        for flip in (False, True):
+            perm = []
+            for i in range(3):
+                for j in range(3):
+                    r, c = (i, 2 - j) if flip else (i, j)
+                    for _ in range(k):
+                        r, c = 2 - c, r
+                    perm.append(r * 3 + c)
+            maps.append(tuple(perm))
+    return maps
+
+
+SYMMETRIES = symmetries()
+
+# Lookup tables indexed by a 9-bit pattern
+POPCOUNT = bytes(bin(bits).count("1") for bits in range(512))
+WINNING = bytes(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(512))
+CELLS = tuple(tuple(k for k in range(9) if bits >> k & 1) for bits in range(512))
+SYMMETRY_TABLES = tuple(
+    array("H", (sum(1 << n for n, k in enumerate(perm) if bits >> k & 1)
+                for bits in range(512)))
+    for perm in SYMMETRIES
+)
+
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board of (x, o) bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def x_to_move(x, o):
+    """
+    X moves first, so it is X's turn whenever both have as many marks.
+    """
+    return POPCOUNT[x] == POPCOUNT[o]
+
+
+def player(x, o):
+    return X if POPCOUNT[x] == POPCOUNT[o] else O
+
+
+def winner(x, o):
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(x, o):
+    return bool(WINNING[x] or WINNING[o]) or x | o == FULL
+
+
+def utility(x, o):
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def moves(x, o):
+    """
+    Returns the empty cell indices of a position, in board order.
+    """
+    return CELLS[FULL & ~(x | o)]
+
+
+def play(x, o, cell):
+    """
+    Returns the position after the player to move takes `cell`.
+    """
+    if POPCOUNT[x] == POPCOUNT[o]:
+        return x | 1 << cell, o
+    return x, o | 1 << cell
+
+
+def canonical(x, o):
+    """
+    Returns one int identifying a position up to the 8 board symmetries:
+    the smallest packed (x, o) pair among its symmetric variants.
+    """
+    return min(table[x] << 9 | table[o] for table in SYMMETRY_TABLES)
+
+
+def canonical_symmetry(x, o):
+    """
+    Returns the canonical key of a position with the index into SYMMETRIES
+    of a symmetry that maps it there. Cell m of the canonical position is
+    cell SYMMETRIES[index][m] of the original.
+    """
+    return min((table[x] << 9 | table[o], index)
+               for index, table in enumerate(SYMMETRY_TABLES))
@@ -0,0 +1,296 @@
+"""
+Monte Carlo Tree Search player for Tic Tac Toe and its m,n,k variants.
+
+The tree is grown with UCT over the player/actions/result/terminal/utility
+API of tictactoe.py, or of an mnk.Game for other board sizes. Random
+playouts run on bitboards with a reused scratch list of empty cells, and
+the subtree of the position actually reached is kept between moves.
+
+Run `python mcts.py` for a batch self-play benchmark.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+import mnk
+import tictactoe as ttt
+
+
+class Node():
+    """
+    A position in the search tree. `wins` counts playout results from the
+    point of view of the player who made `action`, with draws as half.
+    """
+
+    __slots__ = ("board", "x", "o", "parent", "action", "mover",
+                 "children", "untried", "visits", "wins")
+
+    def __init__(self, board, x, o, parent=None, action=None, mover=None):
+        self.board = board
+        self.x = x
+        self.o = o
+        self.parent = parent
+        self.action = action
+        self.mover = mover
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS():
+    """
+    A UCT player for `game`, the tictactoe module or an mnk.Game. Each
+    move searches for `time_limit` seconds or `playouts` playouts,
+    whichever runs out first, but always runs at least one playout.
+    """
+
+    def __init__(self, game=ttt, time_limit=None, playouts=1000,
+                 exploration=math.sqrt(2), seed=None):
+        if time_limit is None and playouts is None:
+            raise ValueError("need a time limit or a playout limit")
+        if playouts is not None and playouts < 1:
+            raise ValueError("need at least one playout per move")
+        self.game = game
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.exploration = exploration
+        self.random = random.Random(seed)
+
+        # Bitboard engine for playouts, matching the game's board size
+        board = game.initial_state()
+        self.engine = mnk.Game(len(board), len(board[0]), getattr(game, "k", 3))
+        self.scratch = [0] * self.engine.size
+
+        self.root = None
+        # Playouts and reused visits of the last move, and totals over all moves
+        self.counters = {"playouts": 0, "reused": 0, "moves": 0, "total_playouts": 0}
+
+    def minimax(self, board):
+        """
+        Returns the action chosen for the current player on the board, or
+        None if the game is over. Named after tictactoe.minimax so either
+        can drive runner.py.
+        """
+        if self.game.terminal(board):
+            return None
+
+        root = self.reuse(board)
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        playouts = 0
+        while True:
+            # The first playout gives the root a child to return
+            self.iterate(root)
+            playouts += 1
+            if self.playouts is not None and playouts >= self.playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self.counters["playouts"] = playouts
+        self.counters["moves"] += 1
+        self.counters["total_playouts"] += playouts
+
+        # The most visited move is the most robust choice
+        best = max(root.children, key=lambda child: child.visits)
+        self.root = best
+        return best.action
+
+    def reuse(self, board):
+        """
+        Returns the tree node for `board`, reusing the subtree from the
+        last search when the board follows from the move it chose.
+        """
+        candidates = [self.root] if self.root is not None else []
+        if self.root is not None:
+            candidates.extend(self.root.children)
+        for node in candidates:
+            if node.board == board:
+                node.parent = None
+                self.counters["reused"] = node.visits
+                return node
+
+        x, o = self.engine.from_board(board)
+        self.counters["reused"] = 0
+        return Node([row[:] for row in board], x, o)
+
+    def iterate(self, root):
+        """Runs one select, expand, playout and backpropagate cycle."""
+        game = self.game
+        node = root
+
+        # Select down fully expanded nodes by UCT
+        while node.untried is not None and not node.untried and node.children:
+            node = self.select(node)
+
+        # Expand one untried move
+        if node.untried is None:
+            node.untried = [] if game.terminal(node.board) else sorted(game.actions(node.board))
+            self.random.shuffle(node.untried)
+        if node.untried:
+            action = node.untried.pop()
+            cell = action[0] * self.engine.cols + action[1]
+            mover = game.player(node.board)
+            if mover == ttt.X:
+                x, o = node.x | 1 << cell, node.o
+            else:
+                x, o = node.x, node.o | 1 << cell
+            child = Node(game.result(node.board, action), x, o, node, action, mover)
+            node.children.append(child)
+            node = child
+
+        if game.terminal(node.board):
+            outcome = game.utility(node.board)
+        else:
+            outcome = self.playout(node.x, node.o)
+
+        # Backpropagate, scoring each node for the player who moved into it
+        while node is not None:
+            node.visits += 1
+            if node.mover is not None:
+                node.wins += (1 + outcome) / 2 if node.mover == ttt.X else (1 - outcome) / 2
+            node = node.parent
+
+    def select(self, node):
+        scale = self.exploration * math.sqrt(math.log(node.visits))
+        return max(
+            node.children,
+            key=lambda child: child.wins / child.visits + scale / math.sqrt(child.visits)
+        )
+
+    def playout(self, x, o):
+        """
+        Plays random moves from a non-terminal (x, o) position to the end,
+        returning its utility. Empty cells are drawn from a scratch list
+        that is reused between playouts.
+        """
+        engine = self.engine
+        empty = self.scratch
+        count = 0
+        occupied = x | o
+        for cell in range(engine.size):
+            if not occupied >> cell & 1:
+                empty[count] = cell
+                count += 1
+
+        randrange = self.random.randrange
+        x_turn = x.bit_count() == o.bit_count()
+        while count:
+            k = randrange(count)
+            cell = empty[k]
+            count -= 1
+            empty[k] = empty[count]
+            if x_turn:
+                x |= 1 << cell
+                if engine.wins_with(x, cell):
+                    return 1
+            else:
+                o |= 1 << cell
+                if engine.wins_with(o, cell):
+                    return -1
+            x_turn = not x_turn
+        return 0
+
+
+def play(game, player_x, player_o):
+    """
+    Plays one game between two objects with a minimax(board) method,
+    returning the winner and the seconds each side spent moving.
+    """
+    board = game.initial_state()
+    seconds = {ttt.X: 0.0, ttt.O: 0.0}
+    while not game.terminal(board):
+        turn = game.player(board)
+        start = time.perf_counter()
+        action = (player_x if turn == ttt.X else player_o).minimax(board)
+        seconds[turn] += time.perf_counter() - start
+        board = game.result(board, action)
+    return game.winner(board), seconds
+
+
+class RandomPlayer():
+
+    def __init__(self, game, seed=None):
+        self.game = game
+        self.random = random.Random(seed)
+
+    def minimax(self, board):
+        return self.random.choice(sorted(self.game.actions(board)))
+
+
+class SearchPlayer():
+    """Alpha-beta search: tictactoe.minimax on 3x3, mnk.Game otherwise."""
+
+    def __init__(self, game, time_limit):
+        self.game = game
+        self.time_limit = time_limit
+
+    def minimax(self, board):
+        if self.game is ttt:
+            return ttt.minimax(board)
+        return self.game.minimax(board, self.time_limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCTS in batch self-play.")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--playouts", type=int, default=2000, help="playouts per move")
+    parser.add_argument("--time", type=float, default=None,
+                        help="seconds per move, for MCTS and alpha-beta opponents")
+    parser.add_argument("--opponent", choices=("mcts", "search", "random"), default="search")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if (args.rows, args.cols, args.k) == (3, 3, 3):
+        game = ttt
+    else:
+        game = mnk.Game(args.rows, args.cols, args.k)
+
+    tally = {"mcts": 0, "opponent": 0, "draw": 0}
+    mcts_seconds = 0.0
+    mcts_moves = 0
+    playouts = 0
+    for n in range(args.games):
+        player = MCTS(game, args.time, args.playouts, seed=args.seed + n)
+        if args.opponent == "mcts":
+            opponent = MCTS(game, args.time, args.playouts, seed=args.seed + n + args.games)
+        elif args.opponent == "random":
+            opponent = RandomPlayer(game, seed=args.seed + n)
+        else:
+            opponent = SearchPlayer(game, args.time or 1.0)
+
+        # MCTS alternates between playing X and O
+        mcts_mark = ttt.X if n % 2 == 0 else ttt.O
+        if mcts_mark == ttt.X:
+            winner, seconds = play(game, player, opponent)
+        else:
+            winner, seconds = play(game, opponent, player)
+        mcts_seconds += seconds[mcts_mark]
+        mcts_moves += player.counters["moves"]
+        playouts += player.counters["total_playouts"]
+
+        if winner is None:
+            tally["draw"] += 1
+        elif winner == mcts_mark:
+            tally["mcts"] += 1
+        else:
+            tally["opponent"] += 1
+
+    report = {
+        "config": vars(args),
+        "results": tally,
+        "mean_move_seconds": mcts_seconds / mcts_moves if mcts_moves else None,
+        "playouts_per_second": playouts / mcts_seconds if mcts_seconds else None,
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
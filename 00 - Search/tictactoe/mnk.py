@@ -0,0 +1,341 @@
+"""
+Tic Tac Toe generalised to m,n,k-games, where k marks in a row win on a
+board of any size.
+
+Positions are bitboards as in bitboard.py, two ints with bit
+i * cols + j standing for cell (i, j). Full search is out of reach past
+3x3, so moves come from iterative-deepening alpha-beta search under a
+time budget, with a transposition table, move ordering and a heuristic
+evaluation of the lines still open to each player.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position, less the plies taken to win it
+WIN = 1000000
+
+# Transposition table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out."""
+
+
+class Game():
+    """
+    An m,n,k-game: `k` in a row on a `rows` by `cols` board wins.
+
+    Boards passed to the list methods are lists of lists of X, O and
+    EMPTY, like those of tictactoe.py. On boards of more than 16 cells,
+    search only considers empty cells within `radius` of a mark.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3, radius=None):
+        if rows < 1 or cols < 1 or not 1 <= k <= max(rows, cols):
+            raise ValueError(f"no {k} in a row fits a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+
+        self.lines = self.line_masks()
+        self.cell_lines = [[mask for mask in self.lines if mask >> cell & 1]
+                           for cell in range(self.size)]
+
+        # Open lines with n marks are worth WEIGHTS[n]
+        self.weights = [0] + [4 ** n for n in range(1, k + 1)]
+
+        if radius is None:
+            radius = 0 if self.size <= 16 else 2
+        self.radius = radius
+        self.neighborhoods = [self.neighborhood(cell) for cell in range(self.size)]
+
+        # Cells nearest the center first, the default move order
+        middle = ((rows - 1) / 2, (cols - 1) / 2)
+        self.cell_order = sorted(
+            range(self.size),
+            key=lambda cell: abs(cell // cols - middle[0]) + abs(cell % cols - middle[1])
+        )
+
+        self.counters = {"nodes": 0, "depth": 0, "table_hits": 0}
+        self.reset(0)
+
+    def line_masks(self):
+        """
+        Returns a bitmask for every run of k cells in a row, column or
+        diagonal.
+        """
+        masks = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (self.k - 1)
+                    end_j = j + dj * (self.k - 1)
+                    if 0 <= end_i < self.rows and 0 <= end_j < self.cols:
+                        masks.append(sum(
+                            1 << ((i + di * n) * self.cols + j + dj * n)
+                            for n in range(self.k)
+                        ))
+        return list(dict.fromkeys(masks))
+
+    def neighborhood(self, cell):
+        """Returns the mask of cells within `radius` of a cell."""
+        row, col = divmod(cell, self.cols)
+        mask = 0
+        for i in range(max(0, row - self.radius), min(self.rows, row + self.radius + 1)):
+            for j in range(max(0, col - self.radius), min(self.cols, col + self.radius + 1)):
+                mask |= 1 << (i * self.cols + j)
+        return mask
+
+    # List-of-lists API, as in tictactoe.py
+
+    def initial_state(self):
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def from_board(self, board):
+        """Returns the (x, o) bitboards of a list-of-lists board."""
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (i * self.cols + j)
+                elif cell == O:
+                    o |= 1 << (i * self.cols + j)
+        return x, o
+
+    def to_board(self, x, o):
+        """Returns the list-of-lists board of (x, o) bitboards."""
+        board = self.initial_state()
+        for cell in range(self.size):
+            if x >> cell & 1:
+                board[cell // self.cols][cell % self.cols] = X
+            elif o >> cell & 1:
+                board[cell // self.cols][cell % self.cols] = O
+        return board
+
+    def player(self, board):
+        x, o = self.from_board(board)
+        return X if x.bit_count() == o.bit_count() else O
+
+    def actions(self, board):
+        x, o = self.from_board(board)
+        empty = self.full & ~(x | o)
+        return {divmod(cell, self.cols) for cell in range(self.size) if empty >> cell & 1}
+
+    def result(self, board, action):
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols) or board[i][j] != EMPTY:
+            raise Exception('Action not possible.')
+        board_copy = [row[:] for row in board]
+        board_copy[i][j] = self.player(board)
+        return board_copy
+
+    def winner(self, board):
+        x, o = self.from_board(board)
+        if self.wins(x):
+            return X
+        if self.wins(o):
+            return O
+        return None
+
+    def terminal(self, board):
+        x, o = self.from_board(board)
+        return self.wins(x) or self.wins(o) or x | o == self.full
+
+    def utility(self, board):
+        return {X: 1, O: -1, None: 0}[self.winner(board)]
+
+    def minimax(self, board, time_limit=1.0, max_depth=None):
+        """
+        Returns the best action found for the current player within
+        `time_limit` seconds, or None if the game is over.
+        """
+        if self.terminal(board):
+            return None
+        cell, _ = self.search(*self.from_board(board), time_limit, max_depth)
+        return divmod(cell, self.cols)
+
+    # Bitboard engine
+
+    def wins(self, bits):
+        return any(bits & mask == mask for mask in self.lines)
+
+    def wins_with(self, bits, cell):
+        """True if `bits` has a complete line through `cell`."""
+        return any(bits & mask == mask for mask in self.cell_lines[cell])
+
+    def evaluate(self, me, them):
+        """
+        Scores a position for the player to move, `me`: each line free of
+        the other player's marks counts for whoever has marks in it, more
+        the closer it is to complete.
+        """
+        weights = self.weights
+        score = 0
+        for mask in self.lines:
+            mine = me & mask
+            theirs = them & mask
+            if not theirs:
+                score += weights[mine.bit_count()]
+            elif not mine:
+                score -= weights[theirs.bit_count()]
+        return score
+
+    def ordered_moves(self, me, them, first=None):
+        """
+        Returns the candidate moves of a position: `first` (usually the
+        table's best move), then by history score, then nearest the center.
+        """
+        occupied = me | them
+        candidates = 0
+        if self.radius and occupied:
+            near = 0
+            bits = occupied
+            while bits:
+                low = bits & -bits
+                near |= self.neighborhoods[low.bit_length() - 1]
+                bits ^= low
+            candidates = near & ~occupied
+        if not candidates:
+            candidates = self.full & ~occupied
+
+        moves = [cell for cell in self.cell_order if candidates >> cell & 1]
+        moves.sort(key=lambda cell: -self.history[cell])
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def search(self, x, o, time_limit=1.0, max_depth=None):
+        """
+        Searches the (x, o) position by iterative deepening for at most
+        `time_limit` seconds, returning (cell, score) for the player to
+        move. The move comes from the deepest fully searched depth, or
+        the first ordered move if not even depth 1 finished in time.
+        """
+        self.reset(time_limit)
+        me, them = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+        moves = self.ordered_moves(me, them)
+        if not moves:
+            raise ValueError("no moves left")
+        if max_depth is None:
+            max_depth = (self.full & ~(x | o)).bit_count()
+
+        best_cell, best_score, reached = moves[0], None, 0
+        for depth in range(1, max_depth + 1):
+            try:
+                best_cell, best_score = self.search_root(me, them, depth, best_cell)
+            except SearchTimeout:
+                break
+            reached = depth
+
+            # A forced win or loss will not change with more depth
+            if abs(best_score) >= WIN // 2:
+                break
+
+        self.counters = {"nodes": self.nodes, "depth": reached, "table_hits": self.table_hits}
+        return best_cell, best_score
+
+    def reset(self, time_limit):
+        """Starts a new search of at most `time_limit` seconds."""
+        self.deadline = time.perf_counter() + time_limit
+        self.nodes = 0
+        self.table_hits = 0
+        self.table = {}
+        self.history = [0] * self.size
+
+    def search_root(self, me, them, depth, first):
+        best_cell = None
+        alpha = -math.inf
+        for cell in self.ordered_moves(me, them, first):
+            score = self.search_move(me, them, cell, depth, alpha)
+            if score >= WIN // 2:
+                return cell, score
+            if best_cell is None or score > alpha:
+                best_cell, alpha = cell, score
+        return best_cell, alpha
+
+    def search_move(self, me, them, cell, depth, alpha=-math.inf):
+        """
+        Returns the score for `me` of playing `cell`, searched `depth`
+        plies deep. Scores at or below `alpha` are only upper bounds.
+        """
+        bit = 1 << cell
+        if self.wins_with(me | bit, cell):
+            return WIN - 1
+        return -self.negamax(them, me | bit, depth - 1, -math.inf, -alpha, 1)
+
+    def negamax(self, me, them, depth, alpha, beta, ply):
+        """
+        Returns the score of a position for the player to move, `me`,
+        searched `depth` plies deep within the window (alpha, beta).
+        """
+        self.nodes += 1
+        if time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+        if me | them == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, them)
+
+        key = (me, them)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, score, bound, first = entry
+            if entry_depth >= depth:
+                score = from_table(score, ply)
+                if (bound == EXACT or (bound == LOWER and score >= beta)
+                        or (bound == UPPER and score <= alpha)):
+                    self.table_hits += 1
+                    return score
+
+        low = alpha
+        best = -math.inf
+        best_cell = None
+        for cell in self.ordered_moves(me, them, first):
+            bit = 1 << cell
+            if self.wins_with(me | bit, cell):
+                score = WIN - ply - 1
+            else:
+                score = -self.negamax(them, me | bit, depth - 1, -beta, -alpha, ply + 1)
+            if score > best:
+                best, best_cell = score, cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self.history[cell] += depth * depth
+                break
+
+        if best <= low:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[key] = (depth, to_table(best, ply), bound, best_cell)
+        return best
+
+
+def to_table(score, ply):
+    """Stores win scores relative to the position rather than the root."""
+    if score >= WIN // 2:
+        return score + ply
+    if score <= -WIN // 2:
+        return score - ply
+    return score
+
+
+def from_table(score, ply):
+    if score >= WIN // 2:
+        return score - ply
+    if score <= -WIN // 2:
+        return score + ply
+    return score
@@ -0,0 +1,244 @@
+"""
+Parallel root-split search for m,n,k games.
+
+At each depth the first root move is searched in this process to set a
+bound (young brothers wait), then the remaining root moves are spread
+over a process pool. Workers share the best root score found so far
+through shared memory, so each move is searched against the tightest
+bound known when it starts.
+
+Run `python parallel.py` to compare it with single-core search.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mnk
+
+# Below any real score, for a shared bound that is not yet set
+NO_BOUND = -2 * mnk.WIN
+
+# Per-worker state, set up by load_worker
+worker_game = None
+worker_bound = None
+worker_search = None
+
+
+def load_worker(rows, cols, k, radius, bound):
+    global worker_game, worker_bound
+    worker_game = mnk.Game(rows, cols, k, radius)
+    worker_bound = bound
+
+
+def search_move(search_id, me, them, cell, depth, deadline):
+    """
+    Searches one root move in a worker until the wall-clock `deadline`.
+    Returns (cell, score, exact, nodes), with a score of None on timeout.
+    The move is searched against the shared bound, so the score is only
+    exact if it beats that bound; otherwise it is an upper bound.
+
+    Workers keep their transposition table for as long as they are given
+    moves of the same search.
+    """
+    global worker_search
+    game = worker_game
+    remaining = deadline - time.time()
+    if search_id != worker_search:
+        game.reset(remaining)
+        worker_search = search_id
+    else:
+        game.deadline = time.perf_counter() + remaining
+
+    nodes = game.nodes
+    alpha = worker_bound.value
+    try:
+        score = game.search_move(me, them, cell, depth, alpha)
+    except mnk.SearchTimeout:
+        return cell, None, False, game.nodes - nodes
+
+    exact = score > alpha
+    if exact:
+        with worker_bound.get_lock():
+            if score > worker_bound.value:
+                worker_bound.value = score
+    return cell, score, exact, game.nodes - nodes
+
+
+class ParallelSearch():
+    """
+    A process pool searching positions of one Game. Use as a context
+    manager, or call close() when done.
+    """
+
+    def __init__(self, game, workers=None):
+        self.game = game
+        self.bound = multiprocessing.Value("q", NO_BOUND)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=load_worker,
+            initargs=(game.rows, game.cols, game.k, game.radius, self.bound)
+        )
+        self.searches = 0
+        self.worker_nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def search(self, x, o, time_limit=1.0, max_depth=None):
+        """
+        Same contract as Game.search, with the root moves of each depth
+        searched in parallel. Game.counters counts nodes in all processes.
+        """
+        game = self.game
+        game.reset(time_limit)
+        deadline = time.time() + time_limit
+        self.searches += 1
+        self.worker_nodes = 0
+
+        me, them = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+        moves = game.ordered_moves(me, them)
+        if not moves:
+            raise ValueError("no moves left")
+        if max_depth is None:
+            max_depth = (game.full & ~(x | o)).bit_count()
+
+        best_cell, best_score, reached = moves[0], None, 0
+        for depth in range(1, max_depth + 1):
+            try:
+                result = self.search_root(me, them, depth, best_cell, deadline)
+            except mnk.SearchTimeout:
+                break
+            if result is None:
+                break
+            best_cell, best_score = result
+            reached = depth
+            if abs(best_score) >= mnk.WIN // 2:
+                break
+
+        game.counters = {"nodes": game.nodes + self.worker_nodes, "depth": reached,
+                         "table_hits": game.table_hits}
+        return best_cell, best_score
+
+    def search_root(self, me, them, depth, first, deadline):
+        """
+        Searches every root move to `depth`, returning the best (cell,
+        score), or None if a worker ran out of time.
+        """
+        moves = self.game.ordered_moves(me, them, first)
+
+        # The eldest brother is searched alone to give the others a bound
+        best_cell = moves[0]
+        best = self.game.search_move(me, them, best_cell, depth)
+        if best >= mnk.WIN // 2 or len(moves) == 1:
+            return best_cell, best
+        self.bound.value = best
+
+        futures = [
+            self.executor.submit(search_move, self.searches, me, them, cell, depth, deadline)
+            for cell in moves[1:]
+        ]
+        # Upper bounds never beat `best`: the bound they failed to beat
+        # was an exact score already merged or still to come
+        complete = True
+        for future in futures:
+            cell, score, exact, nodes = future.result()
+            self.worker_nodes += nodes
+            if score is None:
+                complete = False
+            elif exact and score > best:
+                best_cell, best = cell, score
+        return (best_cell, best) if complete else None
+
+
+def random_position(game, plies, rng):
+    """Returns an (x, o) position after `plies` random moves near the center."""
+    x = o = 0
+    for ply in range(plies):
+        me, them = (x, o) if ply % 2 == 0 else (o, x)
+        cell = rng.choice(game.ordered_moves(me, them)[:8])
+        if ply % 2 == 0:
+            x |= 1 << cell
+        else:
+            o |= 1 << cell
+        if game.wins(x) or game.wins(o):
+            break
+    return x, o
+
+
+def move_score(game, x, o, cell, depth):
+    """
+    Returns the exact score of playing `cell` in the (x, o) position,
+    searched to `depth` with a full window.
+    """
+    me, them = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+    game.reset(math.inf)
+    return game.search_move(me, them, cell, depth)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare parallel and single-core m,n,k search at a fixed depth."
+    )
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--plies", type=int, default=4, help="random moves before each position")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game = mnk.Game(args.rows, args.cols, args.k)
+    rng = random.Random(args.seed)
+    positions = [random_position(game, args.plies, rng) for _ in range(args.positions)]
+    positions = [p for p in positions if not (game.wins(p[0]) or game.wins(p[1]))]
+
+    results = []
+    with ParallelSearch(game, args.workers) as parallel:
+        for x, o in positions:
+            start = time.perf_counter()
+            _, serial_score = game.search(x, o, math.inf, args.depth)
+            serial_seconds = time.perf_counter() - start
+            serial_nodes = game.counters["nodes"]
+
+            start = time.perf_counter()
+            parallel_cell, parallel_score = parallel.search(x, o, math.inf, args.depth)
+            parallel_seconds = time.perf_counter() - start
+            parallel_nodes = game.counters["nodes"]
+
+            results.append({
+                "serial_seconds": serial_seconds,
+                "parallel_seconds": parallel_seconds,
+                "speedup": serial_seconds / parallel_seconds,
+                "serial_nodes": serial_nodes,
+                "parallel_nodes": parallel_nodes,
+                "same_score": serial_score == parallel_score,
+                # The chosen move must really be worth the reported score
+                "move_checked": move_score(game, x, o, parallel_cell, args.depth) == parallel_score,
+            })
+
+    serial_total = sum(r["serial_seconds"] for r in results)
+    parallel_total = sum(r["parallel_seconds"] for r in results)
+    summary = {
+        "config": vars(args),
+        "positions": results,
+        "speedup": serial_total / parallel_total if parallel_total else None,
+    }
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
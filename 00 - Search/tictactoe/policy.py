@@ -0,0 +1,119 @@
+"""
+Precomputed Tic Tac Toe policy.
+
+Every reachable position is solved once, reduced to its canonical form
+under the 8 board symmetries, and its best move stored in policy.bin next
+to this file. Run `python policy.py` to build the table; minimax looks
+moves up in it and falls back to search while it is missing.
+"""
+
+import os
+import struct
+
+import bitboard
+
+POLICY_NAME = "policy.bin"
+MAGIC = b"TTTPOL01"
+
+# Canonical key -> best move in canonical orientation, loaded on first lookup
+table = None
+
+
+def policy_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), POLICY_NAME)
+
+
+def reachable():
+    """
+    Returns the canonical keys of every non-terminal position reachable
+    from the empty board.
+    """
+    keys = set()
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        if bitboard.terminal(x, o):
+            continue
+        key = bitboard.canonical(x, o)
+        if key in keys:
+            continue
+        keys.add(key)
+        for cell in bitboard.moves(x, o):
+            stack.append(bitboard.play(x, o, cell))
+    return keys
+
+
+def build(value):
+    """
+    Solves every reachable canonical position with `value`, a function
+    returning the utility of an (x, o) position. Returns a dict of
+    canonical key to best move.
+    """
+    moves = {}
+    for key in sorted(reachable()):
+        x, o = key >> 9, key & bitboard.FULL
+        sign = 1 if bitboard.x_to_move(x, o) else -1
+        moves[key] = max(bitboard.moves(x, o),
+                         key=lambda cell: sign * value(*bitboard.play(x, o, cell)))
+    return moves
+
+
+def write(moves, path=None):
+    """
+    Writes a policy as MAGIC, a count, the sorted keys as 32-bit ints
+    and one byte per move.
+    """
+    keys = sorted(moves)
+    with open(path or policy_path(), "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack(f"<I{len(keys)}I", len(keys), *keys))
+        f.write(bytes(moves[key] for key in keys))
+
+
+def read(path=None):
+    """
+    Returns the policy stored at `path`, or None if it is missing or
+    not a policy file.
+    """
+    try:
+        with open(path or policy_path(), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(MAGIC)] != MAGIC:
+        return None
+    (count,) = struct.unpack_from("<I", data, len(MAGIC))
+    start = len(MAGIC) + 4
+    if len(data) != start + 5 * count:
+        return None
+    keys = struct.unpack_from(f"<{count}I", data, start)
+    return dict(zip(keys, data[start + 4 * count:]))
+
+
+def lookup(x, o):
+    """
+    Returns the best cell to play in an (x, o) position, or None if the
+    position is not in the policy table.
+    """
+    global table
+    if table is None:
+        table = read() or {}
+    key, index = bitboard.canonical_symmetry(x, o)
+    move = table.get(key)
+    if move is None:
+        return None
+    return bitboard.SYMMETRIES[index][move]
+
+
+def main():
+    global table
+    import tictactoe
+
+    print("Solving positions...")
+    table = build(tictactoe.value)
+    write(table)
+    print(f"Wrote {len(table)} positions to {policy_path()}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,63 @@
 import pygame
 import sys
+import threading
 import time
 
 import tictactoe as ttt
 
+
+class AIWorker():
+    """
+    Computes AI moves on a background thread, so the window keeps drawing
+    and handling events while the computer thinks.
+
+    `search(board, cancelled)` must return a move, and should raise
+    ttt.SearchCancelled soon after the threading.Event `cancelled` is
+    set. Each move gets its own daemon thread, so a search that is still
+    winding down never delays the next one or the interpreter's exit.
+    """
+
+    def __init__(self, search=ttt.minimax):
+        self.search = search
+        self.thread = None
+        self.cancelled = None
+        # Filled in by the current request's thread, one list per request
+        self.moves = []
+
+    def start(self, board):
+        self.cancel()
+        self.cancelled = threading.Event()
+        self.moves = []
+        self.thread = threading.Thread(
+            target=self.run, args=([row[:] for row in board], self.cancelled, self.moves),
+            daemon=True
+        )
+        self.thread.start()
+
+    def run(self, board, cancelled, moves):
+        try:
+            moves.append(self.search(board, cancelled))
+        except ttt.SearchCancelled:
+            pass
+
+    def poll(self):
+        """
+        Returns the computed move once it is ready, otherwise None.
+        """
+        if self.thread is None or self.thread.is_alive():
+            return None
+        self.thread = None
+        return self.moves[0] if self.moves else None
+
+    def cancel(self):
+        if self.cancelled is not None:
+            self.cancelled.set()
+        self.thread = None
+
+    def shutdown(self):
+        self.cancel()
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -20,11 +74,14 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 user = None
 board = ttt.initial_state()
 ai_turn = False
+ai = AIWorker()
+clock = pygame.time.Clock()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            ai.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -108,15 +165,17 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, started in the background and polled each frame
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
+            if not ai_turn:
+                ai.start(board)
+                ai_started = time.time()
                 ai_turn = True
+            elif time.time() - ai_started >= 0.5:
+                move = ai.poll()
+                if move is not None:
+                    board = ttt.result(board, move)
+                    ai_turn = False
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -139,8 +198,10 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    ai.cancel()
                     user = None
                     board = ttt.initial_state()
                     ai_turn = False
 
     pygame.display.flip()
+    clock.tick(60)
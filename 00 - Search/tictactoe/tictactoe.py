@@ -3,7 +3,9 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+
+import bitboard
+import policy
 
 X = "X"
 O = "O"
@@ -49,9 +51,10 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    if action in actions(board):
-        board_copy = copy.deepcopy(board)
-        board_copy[action[0]][action[1]] = player(board)
+    i, j = action
+    if 0 <= i < len(board) and 0 <= j < len(board[0]) and board[i][j] == EMPTY:
+        board_copy = [row[:] for row in board]
+        board_copy[i][j] = player(board)
         return board_copy
 
     raise Exception('Action not possible.')
@@ -110,56 +113,117 @@ def utility(board):
     return 0
 
 
-def min_utility(board):
-    # If terminal, board returns current board state utility
-    if terminal(board):
-        return utility(board)
+# Transposition table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
 
-    curr = float('inf')
-    for action in actions(board):
-        res = max_utility(result(board, action))
-        # -1 result instantly provides the optimal outcome for player 0
-        curr = min(curr, res)
+# Canonical bitboard key -> (utility, bound type), kept between calls
+transpositions = {}
 
-    return curr
+# Search node counters, see reset_counters()
+counters = {"nodes": 0, "table_hits": 0}
 
 
-def max_utility(board):
-    # If terminal, board returns current board state utility
-    if terminal(board):
-        return utility(board)
+class SearchCancelled(Exception):
+    """Raised inside a search when its `cancelled` event is set."""
+
+
+def reset_counters():
+    counters["nodes"] = 0
+    counters["table_hits"] = 0
+
+
+def value(x, o, alpha=-1, beta=1, cancelled=None):
+    """
+    Returns the minimax utility of an (x, o) bitboard position, searching
+    with alpha-beta pruning inside (alpha, beta) and memoizing in the
+    transposition table. Raises SearchCancelled once the optional
+    threading.Event `cancelled` is set.
+    """
+    counters["nodes"] += 1
+    if cancelled is not None and cancelled.is_set():
+        raise SearchCancelled()
+    key = bitboard.canonical(x, o)
+    entry = transpositions.get(key)
+    if entry is not None:
+        score, bound = entry
+        if (bound == EXACT or (bound == LOWER and score >= beta)
+                or (bound == UPPER and score <= alpha)):
+            counters["table_hits"] += 1
+            return score
+
+    if bitboard.terminal(x, o):
+        score = bitboard.utility(x, o)
+        transpositions[key] = (score, EXACT)
+        return score
+
+    maximizing = bitboard.x_to_move(x, o)
+    low, high = alpha, beta
+    best = -math.inf if maximizing else math.inf
+    for cell in bitboard.moves(x, o):
+        if maximizing:
+            best = max(best, value(x | 1 << cell, o, alpha, beta, cancelled))
+            alpha = max(alpha, best)
+        else:
+            best = min(best, value(x, o | 1 << cell, alpha, beta, cancelled))
+            beta = min(beta, best)
+        if alpha >= beta:
+            break
+
+    if best <= low:
+        bound = UPPER
+    elif best >= high:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transpositions[key] = (best, bound)
+    return best
 
-    curr = float('-inf')
-    for action in actions(board):
-        res = min_utility(result(board, action))
-        # 1 result instantly provides the optimal outcome for player X
-        curr = max(curr, res)
 
-    return curr
+def min_utility(board):
+    """
+    Returns the utility of a board with O to move under optimal play.
+    """
+    return value(*bitboard.from_board(board))
 
 
-def minimax(board):
+def max_utility(board):
+    """
+    Returns the utility of a board with X to move under optimal play.
+    """
+    return value(*bitboard.from_board(board))
+
+
+def minimax(board, cancelled=None):
     """
     Returns the optimal action for the current player on the board.
+    Raises SearchCancelled once the optional threading.Event `cancelled`
+    is set, so another thread can stop the search.
     """
     if terminal(board):
         return None
 
-    # X maximises score
-    if player(board) == 'X':
-        options = []
-        for action in actions(board):
-            if winner(result(board, action)) == 'X':
-                return action
-            options.append((min_utility(result(board, action)), action))
-        # Sort options by utility value score, select first option
-        return sorted(options, key=lambda x: x[0])[0][-1]
+    x, o = bitboard.from_board(board)
+    cell = policy.lookup(x, o)
+    if cell is not None:
+        return divmod(cell, 3)
 
-    else:
-        options = []
-        for action in actions(board):
-            if winner(result(board, action)) == 'O':
-                return action
-            options.append((max_utility(result(board, action)), action))
-        #
-        return sorted(options, key=lambda x: x[0])[0][1]
+    maximizing = bitboard.x_to_move(x, o)
+    best_action = None
+    alpha, beta = -1, 1
+    for cell in bitboard.moves(x, o):
+
+        # Search for a strictly better move than the best so far
+        if best_action is None:
+            score = value(*bitboard.play(x, o, cell), cancelled=cancelled)
+        else:
+            score = value(*bitboard.play(x, o, cell), alpha, beta, cancelled)
+        if best_action is None or (score > alpha if maximizing else score < beta):
+            best_action = divmod(cell, 3)
+            if maximizing:
+                alpha = score
+            else:
+                beta = score
+        if alpha >= beta:
+            break
+
+    return best_action
@@ -225,8 +225,16 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+def model_check(knowledge, query, backend="enumerate"):
+    """
+    Checks if knowledge base entails query, by enumerating every model
+    or, with backend "sat", by showing knowledge and not query to be
+    unsatisfiable.
+    """
+    if backend == "sat":
+        return sat_entails(knowledge, query)
+    if backend != "enumerate":
+        raise ValueError(f"unknown backend: {backend}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +269,329 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class CNF():
+    """
+    Sentences compiled to conjunctive normal form by Tseitin encoding.
+
+    Each compound subsentence gets a fresh variable and a few clauses
+    tying it to its parts, so the CNF grows linearly with the sentence
+    instead of exponentially. Variables are positive ints, and a literal
+    is a variable or its negation.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.encoded = {}
+        self.clauses = []
+        self.count = 0
+
+    def variable(self, name=None):
+        """Returns the variable of a symbol name, or a fresh one."""
+        if name is None:
+            self.count += 1
+            return self.count
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Adds clauses asserting that a sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when the sentence is,
+        adding the clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+
+        # Subsentences are encoded once, keyed by identity
+        if id(sentence) in self.encoded:
+            return self.encoded[id(sentence)][1]
+
+        v = self.variable()
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            self.clauses.extend([-v, part] for part in parts)
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            self.clauses.extend([v, -part] for part in parts)
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            self.clauses.extend([[-v, -a, b], [-v, a, -b], [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.encoded[id(sentence)] = (sentence, v)
+        return v
+
+
+def index(literal):
+    """Position of a literal in per-literal arrays: 2v for v, 2v + 1 for -v."""
+    return literal << 1 if literal > 0 else (-literal << 1) | 1
+
+
+class Solver():
+    """
+    CDCL SAT solver over clauses of int literals.
+
+    Each clause watches two of its literals, so unit propagation only
+    visits clauses whose watched literal became false. Conflicts are
+    analysed to their first unique implication point, and the learnt
+    clause drives a non-chronological backjump. Decisions pick the most
+    active variable (VSIDS) with its last value (phase saving), and the
+    search restarts on a growing conflict budget.
+    """
+
+    DECAY = 0.95
+    RESTART_BASE = 100
+    RESTART_GROWTH = 1.5
+
+    def __init__(self, count, clauses):
+        self.count = count
+        self.values = [0] * (2 * count + 2)
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.phase = [False] * (count + 1)
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.clauses = []
+        self.watches = [[] for _ in range(2 * count + 2)]
+        self.conflicts = 0
+        self.ok = True
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        """Adds an input clause before solving."""
+        literals = list(dict.fromkeys(clause))
+        if any(-literal in literals for literal in literals):
+            return
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            value = self.values[index(literals[0])]
+            if value == -1:
+                self.ok = False
+            elif value == 0:
+                self.enqueue(literals[0], None)
+        else:
+            self.watch(literals)
+
+    def watch(self, clause):
+        """Stores a clause, watching its first two literals."""
+        self.clauses.append(clause)
+        c = len(self.clauses) - 1
+        self.watches[index(clause[0])].append(c)
+        self.watches[index(clause[1])].append(c)
+        return c
+
+    def enqueue(self, literal, reason):
+        var = abs(literal)
+        self.values[index(literal)] = 1
+        self.values[index(-literal)] = -1
+        self.levels[var] = len(self.limits)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses. Returns the index
+        of a clause with all literals false, or None.
+        """
+        values = self.values
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches[index(false)]
+            kept = []
+            conflict = None
+            i = 0
+            while i < len(watchers):
+                c = watchers[i]
+                i += 1
+                clause = self.clauses[c]
+
+                # Keep the false literal in slot 1
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if values[index(first)] == 1:
+                    kept.append(c)
+                    continue
+
+                # Look for a replacement watch that is not false
+                for k in range(2, len(clause)):
+                    if values[index(clause[k])] != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[index(clause[1])].append(c)
+                        break
+                else:
+                    kept.append(c)
+                    if values[index(first)] == -1:
+                        conflict = c
+                        kept.extend(watchers[i:])
+                        break
+                    self.enqueue(first, c)
+
+            self.watches[index(false)] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a learnt clause from a conflict by resolving back to the
+        first unique implication point. Returns the clause, with its
+        asserting literal first, and the level to backjump to.
+        """
+        level = len(self.limits)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        clause = self.clauses[conflict]
+        position = len(self.trail) - 1
+
+        while True:
+            for q in clause:
+                var = abs(q)
+                if q == literal or var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self.bump(var)
+                if self.levels[var] == level:
+                    pending += 1
+                else:
+                    learnt.append(q)
+
+            # Resolve on the latest assigned literal of this level
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal from the highest remaining level second
+        k = max(range(1, len(learnt)), key=lambda k: self.levels[abs(learnt[k])])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+
+    def backtrack(self, level):
+        """Undoes every assignment above a decision level."""
+        if len(self.limits) <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.values[index(literal)] = 0
+            self.values[index(-literal)] = 0
+            self.reasons[var] = None
+            self.phase[var] = literal > 0
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        best = None
+        for var in range(1, self.count + 1):
+            if self.values[var << 1] == 0 and (best is None or self.activity[var] > self.activity[best]):
+                best = var
+        return best
+
+    def solve(self):
+        """
+        Returns a satisfying model as a list of bools indexed by variable,
+        or None if the clauses are unsatisfiable.
+        """
+        if not self.ok:
+            return None
+        restart = self.RESTART_BASE
+        since_restart = 0
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.limits:
+                    self.ok = False
+                    return None
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.watch(learnt))
+                self.increment /= self.DECAY
+                continue
+
+            if since_restart >= restart:
+                self.backtrack(0)
+                since_restart = 0
+                restart = int(restart * self.RESTART_GROWTH)
+                continue
+
+            var = self.decide()
+            if var is None:
+                return [self.values[v << 1] == 1 for v in range(self.count + 1)]
+            self.limits.append(len(self.trail))
+            self.enqueue(var if self.phase[var] else -var, None)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of a sentence as a dict of symbol names to bools, or
+    None if the sentence is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    model = Solver(cnf.count, cnf.clauses).solve()
+    if model is None:
+        return None
+    return {name: model[var] for name, var in cnf.variables.items()}
+
+
+def sat_entails(knowledge, query):
+    """Checks if knowledge base entails query with the SAT solver."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return Solver(cnf.count, cnf.clauses).solve() is None